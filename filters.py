@@ -0,0 +1,418 @@
+"""
+filters.py — Headline filters & Somali text fixers for Hagarlaawe News Bot
+
+Pure string/regex code that runs on every headline: keyword tables,
+currency/impact detection, regional + Iran-war filters, glossary and
+post-processing of the AI's Somali output.
+
+Kept free of I/O and fully type-annotated so it can be compiled to a C
+extension with mypyc (`mypyc filters.py`). The compiled module shadows
+this file automatically; without it the plain Python version is used.
+"""
+
+import re
+from typing import Iterable, List, Optional, Tuple
+
+from glossary import GLOSSARY
+
+# ==================================================================
+# IMPACT & CURRENCY DETECTION (kept from original)
+# ==================================================================
+RED_FOLDER_KEYWORDS: List[str] = [
+    "Non-Farm", "NFP", "Unemployment Rate", "CPI", "Interest Rate",
+    "Fed Chair", "FOMC", "ECB President", "BOE Governor", "BOJ Governor",
+    "GDP", "Retail Sales", "Rate Decision", "Statement", "Monetary Policy",
+    "Powell", "Lagarde", "Bailey", "Ueda", "Trump"
+]
+
+ORANGE_FOLDER_KEYWORDS: List[str] = [
+    "PPI", "Producer Price", "Core PCE", "Consumer Confidence",
+    "Building Permits", "Housing Starts", "ISM", "PMI", "Trade Balance",
+    "JOLTS", "ADP", "Claimant Count", "Zew", "Ifo", "Tankan"
+]
+
+TARGET_CURRENCIES = {
+    "USD": "🇺🇸", "US": "🇺🇸", "Fed": "🇺🇸", "FOMC": "🇺🇸", "Powell": "🇺🇸", "Trump": "🇺🇸",
+    "EUR": "🇪🇺", "Europe": "🇪🇺", "ECB": "🇪🇺", "Lagarde": "🇪🇺",
+    "JPY": "🇯🇵", "Japan": "🇯🇵", "BOJ": "🇯🇵", "Ueda": "🇯🇵",
+    "GBP": "🇬🇧", "UK": "🇬🇧", "BOE": "🇬🇧", "Bailey": "🇬🇧",
+    "CAD": "🇨🇦", "Canada": "🇨🇦", "BOC": "🇨🇦", "Macklem": "🇨🇦",
+    "AUD": "🇦🇺", "Australia": "🇦🇺", "RBA": "🇦🇺", "Bullock": "🇦🇺",
+    "NZD": "🇳🇿", "New Zealand": "🇳🇿", "RBNZ": "🇳🇿", "Orr": "🇳🇿",
+    "CHF": "🇨🇭", "Swiss": "🇨🇭", "SNB": "🇨🇭", "Jordan": "🇨🇭"
+}
+
+CLUSTER_KEYWORDS: List[str] = [
+    "Speech", "Testimony", "Press Conference", "Meeting Minutes",
+    "Statement", "Trump", "Powell", "Lagarde", "Bailey", "Ueda", "Q&A"
+]
+
+EXCLUSION_KEYWORDS: List[str] = [
+    "auction", "bid-to-cover", "close", "open",
+    "preview", "review", "summary", "poll", "wrap",
+    # Recurring daily items — not actionable news
+    "interest rate probabilities",
+    "interest rate probability",
+    "rate probabilities",
+]
+
+
+def _alternation(keywords: Iterable[str]) -> str:
+    """Longest-first alternation so e.g. 'USD' is tried before 'US'."""
+    return "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+
+
+# Single-pass multi-keyword scanners, compiled once at import. Each one
+# walks the headline ONCE and reports every keyword hit, instead of
+# starting a separate regex search per keyword.
+
+# Flag → currency code handed to the AI as context (USD when unknown).
+FLAG_CURRENCY_CODES = {
+    "🇺🇸": "USD", "🇪🇺": "EUR", "🇯🇵": "JPY", "🇬🇧": "GBP",
+    "🇨🇦": "CAD", "🇦🇺": "AUD", "🇳🇿": "NZD", "🇨🇭": "CHF",
+}
+
+# Currency keyword → (priority, flag, code), resolved once at import.
+# Priority = position in TARGET_CURRENCIES, so when several keywords hit,
+# the earliest entry in the table still wins (USD keywords before EUR, etc.).
+_CURRENCY_LOOKUP = {
+    k.lower(): (i, f, FLAG_CURRENCY_CODES.get(f, "USD"))
+    for i, (k, f) in enumerate(TARGET_CURRENCIES.items())
+}
+_CURRENCY_RE = re.compile(r"\b(" + _alternation(TARGET_CURRENCIES) + r")\b", re.IGNORECASE)
+
+
+def _word_regex(keywords: Iterable[str]) -> "re.Pattern[str]":
+    """Whole-word, case-insensitive match of ANY keyword in one search."""
+    return re.compile(r"\b(?:" + _alternation(keywords) + r")\b", re.IGNORECASE)
+
+
+_RED_RE = _word_regex(RED_FOLDER_KEYWORDS)
+_ORANGE_RE = _word_regex(ORANGE_FOLDER_KEYWORDS)
+_CLUSTER_RE = _word_regex(CLUSTER_KEYWORDS)
+
+# Whole words (plus a plain plural) so "close" no longer fires on
+# "closely"/"disclosed" or "open" on "opened up talks".
+_EXCLUSION_RE = re.compile(
+    r"\b(?:" + _alternation(EXCLUSION_KEYWORDS) + r")s?\b", re.IGNORECASE
+)
+
+# ==================================================================
+# IRAN WAR DETECTION + REGIONAL SKIP FILTER
+# ==================================================================
+# Saki's market thesis: in the current Iran–US–Israel conflict,
+# escalation events drive USD strength (DXY ↑), which pulls Gold DOWN
+# (inverse to DXY), while Oil rallies on supply risk. Hardcode this
+# bias for any Iran war headline so the bot stays consistent with
+# Saki's playbook.
+
+IRAN_PRIMARY: List[str] = [
+    "iran", "tehran", "iranian", "irgc",
+    "khamenei", "pezeshkian", "ayatollah",
+    "quds force", "revolutionary guard",
+]
+
+# Escalation keywords — when combined with Iran primary, this is a "big" Iran war update
+IRAN_ESCALATION: List[str] = [
+    "strike", "strikes", "attack", "attacks", "attacked",
+    "missile", "missiles", "drone", "drones",
+    "war", "retaliat", "bomb", "bombed", "explosion",
+    "killed", "assassinat", "nuclear", "enrich",
+    "military operation", "raid", "shelled",
+    "fired", "launched", "tomahawk",
+    "ceasefire", "sanction", "sanctions",
+    "centrifuge", "uranium", "isfahan", "natanz", "fordow",
+]
+
+# Regional conflicts that are too noisy to post unless directly tied to Iran or US macro.
+# Saki: "keep out other less invested news like Israel Hezbollah, Lebanon, Iraq, Korea."
+SKIP_REGIONAL: List[str] = [
+    "hezbollah",
+    "lebanon", "lebanese", "beirut",
+    "iraq", "iraqi", "baghdad",
+    "north korea", "south korea", "kim jong",
+    "pyongyang", "seoul",
+    "houthi", "houthis", "yemen", "sanaa",
+    "syria", "syrian", "damascus",
+    "gaza", "hamas", "rafah", "west bank",
+]
+
+# Macro/major-currency anchors that ALWAYS override the regional skip
+MAJOR_MACRO_OVERRIDE: List[str] = [
+    "fed", "fomc", "powell",
+    "ecb", "lagarde",
+    "boj", "ueda",
+    "boe", "bailey",
+    "cpi", "ppi", "pce", "nfp", "gdp",
+    "rate decision", "interest rate",
+    "trump", "biden", "white house",
+]
+
+
+_IRAN_PRIMARY_RE = _word_regex(IRAN_PRIMARY)
+_IRAN_ESCALATION_RE = _word_regex(IRAN_ESCALATION)
+_SKIP_REGIONAL_RE = _word_regex(SKIP_REGIONAL)
+_MAJOR_MACRO_RE = _word_regex(MAJOR_MACRO_OVERRIDE)
+
+
+def _has_keyword(text: str, pattern: "re.Pattern[str]") -> bool:
+    """Word-boundary match so 'ppi' doesn't fire inside 'shipping' etc."""
+    return pattern.search(text) is not None
+
+
+def is_iran_war_news(text: str) -> bool:
+    """
+    Returns True only for BIG Iran-war updates:
+    must contain an Iran primary keyword AND an escalation keyword.
+    Small Iran chatter (visits, statements, minor diplomacy) → False.
+    """
+    if not _has_keyword(text, _IRAN_PRIMARY_RE):
+        return False
+    if not _has_keyword(text, _IRAN_ESCALATION_RE):
+        return False
+    return True
+
+
+def should_skip_regional(text: str) -> bool:
+    """
+    Skip small regional conflicts UNLESS Iran is in the headline
+    OR major macro/US anchors are involved.
+    """
+    if not _has_keyword(text, _SKIP_REGIONAL_RE):
+        return False
+    # Don't skip if Iran is involved (let the Iran war handler take over)
+    if _has_keyword(text, _IRAN_PRIMARY_RE):
+        return False
+    # Don't skip if major macro / US political anchors are present
+    if _has_keyword(text, _MAJOR_MACRO_RE):
+        return False
+    return True
+
+
+def should_exclude_headline(text: str) -> bool:
+    """Recurring / low-value items (auctions, previews, wraps...)."""
+    return _EXCLUSION_RE.search(text) is not None
+
+
+# ==================================================================
+# TITLE HELPERS
+# ==================================================================
+
+# Title clean-up patterns, compiled once — these run on every feed entry.
+_SOURCE_PREFIX_RE = re.compile(r"^[^:]+:\s*")
+_FLAG_EMOJI_RE = re.compile(r"[\U0001F1E6-\U0001F1FF]{2}:?\s*")
+_NUMBERS_RE = re.compile(r"[\d.%]+")
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_SPACES_RE = re.compile(r"\s+")
+
+
+def normalize_title(title: str) -> str:
+    """
+    Create a normalized fingerprint from a headline for dedup.
+    Strips punctuation, whitespace, lowercases, and removes numbers
+    so that 'US PCE MoM: 0.3% (exp 0.3%, prev 0.4%)' and
+    'US PCE MoM: 0.3% (Exp 0.3%, Prev 0.4%)' match.
+    Also strips common prefixes like 'FinancialJuice:'.
+    """
+    t = title.lower().strip()
+    # Remove source prefix
+    t = _SOURCE_PREFIX_RE.sub("", t)
+    # Remove all numbers and % signs (the data values change but the indicator is the same)
+    t = _NUMBERS_RE.sub("", t)
+    # Remove punctuation and extra whitespace
+    t = _PUNCT_RE.sub("", t)
+    t = _SPACES_RE.sub(" ", t).strip()
+    return t
+
+
+def get_flag_and_impact(text: str) -> Tuple[Optional[str], Optional[str], str]:
+    flag = None
+    impact = None
+    detected_currency_code = "USD"
+
+    hits = [_CURRENCY_LOOKUP[m.group(1).lower()] for m in _CURRENCY_RE.finditer(text)]
+    if hits:
+        _, flag, detected_currency_code = min(hits)
+
+    if _RED_RE.search(text):
+        impact = "🔴"
+    elif _ORANGE_RE.search(text):
+        impact = "🟠"
+
+    return flag, impact, detected_currency_code
+
+
+def should_buffer(text: str) -> bool:
+    return _CLUSTER_RE.search(text) is not None
+
+
+def clean_title(t: str) -> str:
+    t = _FLAG_EMOJI_RE.sub("", t)
+    t = _SOURCE_PREFIX_RE.sub("", t).strip()
+    return t
+
+
+# ==================================================================
+# SOMALI TEXT FIXERS
+# ==================================================================
+
+# Somali phrases that contain words colliding with English glossary keys.
+# "Cad" (white/clear) collides with CAD currency; "Aqalka Cad" must survive
+# intact. They map to their canonical spelling and ride in the same
+# alternation as the glossary, so no placeholder passes are needed.
+_GLOSSARY_GUARDS = {
+    "aqalka cad": "Aqalka Cad",
+    "si cad": "si cad",       # "clearly"
+    "si cadi": "si cad",      # "clearly" variant
+    "mid cad": "mid cad",     # "a clear one"
+}
+
+# All glossary terms fused into ONE alternation so the text is scanned in a
+# single pass. Longest terms first, so "core cpi" wins over "cpi".
+_GLOSSARY_LOOKUP = {eng.lower(): som for eng, som in GLOSSARY.items()}
+_GLOSSARY_LOOKUP.update(_GLOSSARY_GUARDS)
+
+
+def _glossary_pattern(key: str) -> str:
+    pat = re.escape(key)
+    # Guard phrases tolerate any run of whitespace between their words
+    return pat.replace(r"\ ", r"\s+") if key in _GLOSSARY_GUARDS else pat
+
+
+_GLOSSARY_RE = re.compile(
+    r"\b(" + "|".join(_glossary_pattern(k) for k in sorted(_GLOSSARY_LOOKUP, key=len, reverse=True)) + r")\b",
+    re.IGNORECASE,
+)
+
+
+# Plain substring pre-scan: most short headlines contain no glossary term at
+# all, and `in` is far cheaper than running the regex pass.
+_GLOSSARY_KEYS = tuple(_GLOSSARY_LOOKUP)
+
+
+def _glossary_term(m: "re.Match[str]") -> str:
+    # split/join folds the \s+ runs a guard phrase may have matched
+    return _GLOSSARY_LOOKUP[" ".join(m.group(1).lower().split())]
+
+
+def apply_glossary(text: str) -> str:
+    tl = text.lower()
+    if not any(k in tl for k in _GLOSSARY_KEYS):
+        return text
+    return _GLOSSARY_RE.sub(_glossary_term, text)
+
+
+# Currency codes handled SEPARATELY with case-sensitive matching.
+# Only UPPERCASE ticker symbols get translated — lowercase forms are
+# either Somali words ("cad" = white) or unrelated tokens.
+CURRENCY_CODE_MAP = {
+    "USD": "doollar Mareykanka",
+    "EUR": "yuuro",
+    "JPY": "yen-ka Japan",
+    "GBP": "gini Ingiriis",
+    "CHF": "franka Swiss-ka",
+    "CAD": "doollar Kanada",
+    "AUD": "doollar Australia",
+    "NZD": "doollar New Zealand",
+}
+# All tickers in one case-sensitive alternation → one scan, dict lookup per hit
+_CURRENCY_CODE_RE = re.compile(r"\b(" + "|".join(CURRENCY_CODE_MAP) + r")\b")
+# Compound trading instruments (XAUUSD, EURUSD, USDJPY...)
+_INSTRUMENT_RE = re.compile(r"\b([A-Z]{3,6}/?[A-Z]{0,4})\b")
+
+
+def apply_currency_codes(text: str) -> str:
+    """
+    Replace UPPERCASE currency tickers with Somali names.
+    Case-sensitive on purpose: 'CAD' becomes 'doollar Kanada',
+    but lowercase 'cad' (Somali for 'white/clear') is left alone.
+    Skips common trading terms (XAUUSD, EURUSD, DXY, etc.) where
+    currency codes are part of an instrument name.
+    """
+    # Protect compound trading instruments first (XAUUSD, EURUSD, USDJPY...)
+    # so we don't mangle them
+    instruments: List[str] = []
+    def stash_instrument(m: "re.Match[str]") -> str:
+        token = m.group(0)
+        # only stash if it actually contains a currency code AND is compound
+        if len(token) >= 6 or "/" in token or token in {"DXY", "VIX"}:
+            instruments.append(token)
+            return f"__INSTR_{len(instruments)-1}__"
+        return token
+    text = _INSTRUMENT_RE.sub(stash_instrument, text)
+
+    # Now replace standalone uppercase codes
+    text = _CURRENCY_CODE_RE.sub(lambda m: CURRENCY_CODE_MAP[m.group(1)], text)
+
+    # Restore instruments
+    for i, inst in enumerate(instruments):
+        text = text.replace(f"__INSTR_{i}__", inst)
+
+    return text
+
+
+# (pattern, replacement) pairs for fix_somali_output, applied in order and
+# compiled once at import.
+_SOMALI_FIXES = [(re.compile(p, f), r) for p, r, f in [
+    # --- TRUMP FIXES ---
+    # "Madaxweynihii hore" / "madaxwaynihii hore" → "Madaxweynaha"
+    (r"[Mm]adaxweyni?hii\s+hore", "Madaxweynaha", 0),
+    # "Madaxweynaha hore" → "Madaxweynaha"
+    (r"Madaxweynaha\s+hore", "Madaxweynaha", re.IGNORECASE),
+    # "Donald Trump madaxweynihii hore" patterns
+    (r"madaxweyne\s+hore", "Madaxweynaha", re.IGNORECASE),
+    # "ex-president" style references
+    (r"madaxweynihii\s+hore\s+ee\s+Mareykanka", "Madaxweynaha Mareykanka", re.IGNORECASE),
+
+    # --- INTEREST RATE FIXES ---
+    # "heerka danaha" → "heerka dulsaar"
+    (r"heerka\s+danaha", "heerka dulsaar", re.IGNORECASE),
+    # "heerarka danaha" → "heerarka dulsaar"
+    (r"heerarka\s+danaha", "heerarka dulsaar", re.IGNORECASE),
+    # "heerka ribada" → "heerka dulsaar"
+    (r"heerka\s+ribada", "heerka dulsaar", re.IGNORECASE),
+    # "heerarka ribada" → "heerarka dulsaar"
+    (r"heerarka\s+ribada", "heerarka dulsaar", re.IGNORECASE),
+    # "heerka faa'idada" → "heerka dulsaar"
+    (r"heerka\s+faa['\u2019]?idada", "heerka dulsaar", re.IGNORECASE),
+    # "heerarka faa'idada" → "heerarka dulsaar"
+    (r"heerarka\s+faa['\u2019]?idada", "heerarka dulsaar", re.IGNORECASE),
+    # "qiimaha danaha" → "heerka dulsaar"
+    (r"qiimaha\s+danaha", "heerka dulsaar", re.IGNORECASE),
+    # Catch "dana" standalone when preceded by rate-related context
+    (r"heerka\s+dana\b", "heerka dulsaar", re.IGNORECASE),
+    (r"heerarka\s+dana\b", "heerarka dulsaar", re.IGNORECASE),
+]]
+
+
+def fix_somali_output(text: str) -> str:
+    """
+    Post-process AI-generated Somali text to fix recurring mistakes:
+    1. Trump must always be 'Madaxweynaha' (current president), never 'hore' (former).
+    2. Interest rate must always use 'dulsaar', never 'danaha' or 'ribada'.
+    """
+    for pattern, repl in _SOMALI_FIXES:
+        text = pattern.sub(repl, text)
+    return text
+
+
+def polish_somali(text: str) -> str:
+    """
+    Local clean-up pass for AI Somali output, applied in place of a second
+    "rewrite" model call: glossary terms → currency tickers → style fixes.
+    """
+    if not text:
+        return text
+    return fix_somali_output(apply_currency_codes(apply_glossary(text)))
+
+
+def strip_markdown(text: str) -> str:
+    return text.replace("**", "").replace("__", "")
+
+
+# Opening ```lang fence and closing ``` fence, stripped in one pass.
+_CODE_FENCE_RE = re.compile(r"^```(?:\w+)?\s*|\s*```$")
+
+
+def strip_code_fence(text: str) -> str:
+    return _CODE_FENCE_RE.sub("", text)
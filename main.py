@@ -1,26 +1,39 @@
 import os
 import time
+import calendar
+import heapq
+import signal
+import threading
 import re
 import asyncio
 import logging
 import feedparser
 import sys
 import json
+import copy
+import hashlib
 import httpx
+from collections import OrderedDict, deque
 from datetime import datetime, timezone, timedelta
 from telegram import Bot
-from openai import AsyncOpenAI
-from typing import Optional, List, Dict, Any
+from telegram.error import RetryAfter, NetworkError, TimedOut, BadRequest, Forbidden
+from telegram.request import HTTPXRequest
+from openai import AsyncOpenAI, RateLimitError, InternalServerError
+from typing import Optional, List, Dict, Any, Iterable
 
 # --- FIREBASE SETUP ---
 import firebase_admin
 from firebase_admin import credentials, firestore
 
-# --- IMPORT GLOSSARY ---
+# --- IMPORT GLOSSARY + HEADLINE FILTERS ---
 try:
-    from glossary import GLOSSARY
+    from filters import (
+        is_iran_war_news, should_skip_regional, should_exclude_headline,
+        normalize_title, get_flag_and_impact, should_buffer, clean_title,
+        polish_somali, strip_markdown, strip_code_fence,
+    )
 except ImportError:
-    logging.error("❌ glossary.py not found!")
+    logging.error("❌ filters.py / glossary.py not found!")
     sys.exit(1)
 
 # --- IMPORT BANNER GENERATOR ---
@@ -30,6 +43,21 @@ except ImportError:
     logging.warning("⚠️ banner.py not found — banners disabled.")
     generate_banner = None
 
+# --- OPTIONAL FAST JSON ---
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can
+# keep catching the stdlib exception either way.
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# --- OPTIONAL FASTER EVENT LOOP ---
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 # ==================================================================
@@ -60,6 +88,9 @@ FACEBOOK_PAGE_ID      = os.getenv("FACEBOOK_PAGE_ID")
 
 # --- MODEL CONFIGURATION ---
 AI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4.1")
+# Session recaps only re-bullet lines that are already Somali, so they can
+# run on a cheaper tier (e.g. gpt-4.1-mini). Defaults to the main model.
+SUMMARY_MODEL = os.getenv("OPENAI_SUMMARY_MODEL", AI_MODEL)
 
 if not all([TELEGRAM_BOT_TOKEN, TELEGRAM_CHANNEL_ID, OPENAI_API_KEY]):
     logging.error("Missing ENV variables.")
@@ -67,6 +98,83 @@ if not all([TELEGRAM_BOT_TOKEN, TELEGRAM_CHANNEL_ID, OPENAI_API_KEY]):
 
 RSS_URLS = [u.strip() for u in RSS_URLS_RAW.split(",") if u.strip()]
 
+# --- SHARED CLIENTS ---
+# HTTP/2 lets concurrent OpenAI / Graph API calls multiplex over one
+# TLS connection per host. Needs the h2 package (httpx[http2]).
+try:
+    import h2  # noqa: F401
+    HTTP2_ENABLED = True
+except ImportError:
+    HTTP2_ENABLED = False
+
+# One pooled HTTP client for OpenAI, Facebook and the RSS feeds, so calls
+# reuse keep-alive connections instead of a new TCP+TLS handshake each.
+HTTP_CLIENT = httpx.AsyncClient(
+    http2=HTTP2_ENABLED,
+    # A dead host should fail at connect time, not after the full 30s
+    timeout=httpx.Timeout(30.0, connect=10.0),
+    follow_redirects=True,
+    # Feeds, OpenAI batches and Facebook posts now overlap within a cycle,
+    # so size the pool for all of them at once. Idle sockets outlive one
+    # poll interval so the next cycle reuses them.
+    limits=httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=90.0),
+)
+# The SDK retries 429 / 5xx / connection errors itself with exponential
+# backoff that honours Retry-After; give it a couple more attempts so a
+# short throttle doesn't turn into a "NONE" analysis.
+OPENAI_CLIENT = AsyncOpenAI(api_key=OPENAI_API_KEY, http_client=HTTP_CLIENT, max_retries=4)
+
+# Cap in-flight OpenAI requests: a burst of headlines fans out into
+# concurrent batch + fallback calls, and unbounded that trips rate limits.
+# Tunable per deployment (OpenAI tier rate limits differ).
+OPENAI_MAX_CONCURRENT = max(1, int(os.getenv("OPENAI_CONCURRENCY", "8")))
+
+
+class AdaptiveLimiter:
+    """
+    Async concurrency cap that adapts AIMD-style: the limit is halved when
+    a call still fails throttled (429 / 5xx) after the SDK's own retries,
+    and creeps back up by 0.5 after every `window` clean calls, never
+    past `maximum`.
+    """
+
+    def __init__(self, maximum: int, window: int = 20):
+        self.maximum = maximum
+        self.limit = float(maximum)
+        self.window = window
+        self._active = 0
+        self._successes = 0
+        self._cond = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._active < int(self.limit))
+            self._active += 1
+
+    async def __aexit__(self, exc_type, exc, tb):
+        async with self._cond:
+            self._active -= 1
+            if exc is None:
+                self._successes += 1
+                if self._successes >= self.window and self.limit < self.maximum:
+                    self._successes = 0
+                    self.limit = min(float(self.maximum), self.limit + 0.5)
+            elif isinstance(exc, (RateLimitError, InternalServerError)):
+                self._successes = 0
+                self.limit = max(1.0, self.limit / 2)
+                logging.warning(f"⚠️ OpenAI throttled — concurrency now {int(self.limit)}")
+            self._cond.notify_all()
+        return False
+
+
+_openai_slots = AdaptiveLimiter(OPENAI_MAX_CONCURRENT)
+
+
+async def chat_completion(**kwargs):
+    """OPENAI_CLIENT.chat.completions.create, bounded by _openai_slots."""
+    async with _openai_slots:
+        return await OPENAI_CLIENT.chat.completions.create(**kwargs)
+
 # ==================================================================
 # 3. NEWS CLASSIFICATION CATEGORIES
 # ==================================================================
@@ -133,133 +241,10 @@ CATEGORY_COLORS = {
 }
 
 # ==================================================================
-# 4. IMPACT & CURRENCY DETECTION (kept from original)
+# 4. IRAN WAR OVERRIDE
 # ==================================================================
-RED_FOLDER_KEYWORDS = [
-    "Non-Farm", "NFP", "Unemployment Rate", "CPI", "Interest Rate",
-    "Fed Chair", "FOMC", "ECB President", "BOE Governor", "BOJ Governor",
-    "GDP", "Retail Sales", "Rate Decision", "Statement", "Monetary Policy",
-    "Powell", "Lagarde", "Bailey", "Ueda", "Trump"
-]
-
-ORANGE_FOLDER_KEYWORDS = [
-    "PPI", "Producer Price", "Core PCE", "Consumer Confidence",
-    "Building Permits", "Housing Starts", "ISM", "PMI", "Trade Balance",
-    "JOLTS", "ADP", "Claimant Count", "Zew", "Ifo", "Tankan"
-]
-
-TARGET_CURRENCIES = {
-    "USD": "🇺🇸", "US": "🇺🇸", "Fed": "🇺🇸", "FOMC": "🇺🇸", "Powell": "🇺🇸", "Trump": "🇺🇸",
-    "EUR": "🇪🇺", "Europe": "🇪🇺", "ECB": "🇪🇺", "Lagarde": "🇪🇺",
-    "JPY": "🇯🇵", "Japan": "🇯🇵", "BOJ": "🇯🇵", "Ueda": "🇯🇵",
-    "GBP": "🇬🇧", "UK": "🇬🇧", "BOE": "🇬🇧", "Bailey": "🇬🇧",
-    "CAD": "🇨🇦", "Canada": "🇨🇦", "BOC": "🇨🇦", "Macklem": "🇨🇦",
-    "AUD": "🇦🇺", "Australia": "🇦🇺", "RBA": "🇦🇺", "Bullock": "🇦🇺",
-    "NZD": "🇳🇿", "New Zealand": "🇳🇿", "RBNZ": "🇳🇿", "Orr": "🇳🇿",
-    "CHF": "🇨🇭", "Swiss": "🇨🇭", "SNB": "🇨🇭", "Jordan": "🇨🇭"
-}
-
-CLUSTER_KEYWORDS = [
-    "Speech", "Testimony", "Press Conference", "Meeting Minutes",
-    "Statement", "Trump", "Powell", "Lagarde", "Bailey", "Ueda", "Q&A"
-]
-
-EXCLUSION_KEYWORDS = [
-    "auction", "bid-to-cover", "close", "open",
-    "preview", "review", "summary", "poll", "wrap",
-    # Recurring daily items — not actionable news
-    "interest rate probabilities",
-    "interest rate probability",
-    "rate probabilities",
-]
-
-# ==================================================================
-# 4b. IRAN WAR DETECTION + REGIONAL SKIP FILTER
-# ==================================================================
-# Saki's market thesis: in the current Iran–US–Israel conflict,
-# escalation events drive USD strength (DXY ↑), which pulls Gold DOWN
-# (inverse to DXY), while Oil rallies on supply risk. Hardcode this
-# bias for any Iran war headline so the bot stays consistent with
-# Saki's playbook.
-
-IRAN_PRIMARY = [
-    "iran", "tehran", "iranian", "irgc",
-    "khamenei", "pezeshkian", "ayatollah",
-    "quds force", "revolutionary guard",
-]
-
-# Escalation keywords — when combined with Iran primary, this is a "big" Iran war update
-IRAN_ESCALATION = [
-    "strike", "strikes", "attack", "attacks", "attacked",
-    "missile", "missiles", "drone", "drones",
-    "war", "retaliat", "bomb", "bombed", "explosion",
-    "killed", "assassinat", "nuclear", "enrich",
-    "military operation", "raid", "shelled",
-    "fired", "launched", "tomahawk",
-    "ceasefire", "sanction", "sanctions",
-    "centrifuge", "uranium", "isfahan", "natanz", "fordow",
-]
-
-def _has_keyword(text: str, keywords) -> bool:
-    """Word-boundary match so 'ppi' doesn't fire inside 'shipping' etc."""
-    for k in keywords:
-        if re.search(r"\b" + re.escape(k) + r"\b", text, re.IGNORECASE):
-            return True
-    return False
-
-
-def is_iran_war_news(text: str) -> bool:
-    """
-    Returns True only for BIG Iran-war updates:
-    must contain an Iran primary keyword AND an escalation keyword.
-    Small Iran chatter (visits, statements, minor diplomacy) → False.
-    """
-    if not _has_keyword(text, IRAN_PRIMARY):
-        return False
-    if not _has_keyword(text, IRAN_ESCALATION):
-        return False
-    return True
-
-
-# Regional conflicts that are too noisy to post unless directly tied to Iran or US macro.
-# Saki: "keep out other less invested news like Israel Hezbollah, Lebanon, Iraq, Korea."
-SKIP_REGIONAL = [
-    "hezbollah",
-    "lebanon", "lebanese", "beirut",
-    "iraq", "iraqi", "baghdad",
-    "north korea", "south korea", "kim jong",
-    "pyongyang", "seoul",
-    "houthi", "houthis", "yemen", "sanaa",
-    "syria", "syrian", "damascus",
-    "gaza", "hamas", "rafah", "west bank",
-]
-
-# Macro/major-currency anchors that ALWAYS override the regional skip
-MAJOR_MACRO_OVERRIDE = [
-    "fed", "fomc", "powell",
-    "ecb", "lagarde",
-    "boj", "ueda",
-    "boe", "bailey",
-    "cpi", "ppi", "pce", "nfp", "gdp",
-    "rate decision", "interest rate",
-    "trump", "biden", "white house",
-]
-
-def should_skip_regional(text: str) -> bool:
-    """
-    Skip small regional conflicts UNLESS Iran is in the headline
-    OR major macro/US anchors are involved.
-    """
-    if not _has_keyword(text, SKIP_REGIONAL):
-        return False
-    # Don't skip if Iran is involved (let the Iran war handler take over)
-    if _has_keyword(text, IRAN_PRIMARY):
-        return False
-    # Don't skip if major macro / US political anchors are present
-    if _has_keyword(text, MAJOR_MACRO_OVERRIDE):
-        return False
-    return True
-
+# Keyword tables, currency/impact detection and the regional skip
+# filter live in filters.py (pure string code, mypyc-compilable).
 
 def apply_iran_war_override(analysis: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -286,6 +271,45 @@ def apply_iran_war_override(analysis: Dict[str, Any]) -> Dict[str, Any]:
 news_buffer = {}
 BUFFER_TIMEOUT_SECONDS = 300
 MAX_BUFFER_SIZE = 10
+MAX_BUFFERED_CLUSTERS = 50  # cap on open cluster keys; oldest is dropped past this
+
+# Min-heap of (due_time, key, start_time). A buffer is due at its timeout,
+# or immediately once full. start_time tells a live entry apart from a
+# stale one left behind by a buffer that was already flushed or evicted.
+_buffer_deadlines: List[tuple] = []
+
+
+def buffer_headline(key: str, headline: str, currency: str):
+    """Add a headline to its cluster buffer, opening the buffer if needed."""
+    now = time.time()
+    data = news_buffer.get(key)
+    if data is None:
+        if len(news_buffer) >= MAX_BUFFERED_CLUSTERS:
+            oldest = next(iter(news_buffer))
+            del news_buffer[oldest]
+            logging.warning(f"⚠️ Cluster buffer full — dropped {oldest}")
+        data = news_buffer[key] = {
+            # Bounded: a burst past MAX_BUFFER_SIZE evicts the
+            # oldest headline instead of growing the prompt
+            'headlines': deque(maxlen=MAX_BUFFER_SIZE),
+            'start_time': now,
+            'currency': currency,
+        }
+        heapq.heappush(_buffer_deadlines, (now + BUFFER_TIMEOUT_SECONDS, key, now))
+    data['headlines'].append(headline)
+    if len(data['headlines']) == MAX_BUFFER_SIZE:
+        heapq.heappush(_buffer_deadlines, (now, key, data['start_time']))
+
+
+def pop_ripe_buffers(now: float) -> List[tuple]:
+    """Remove and return (key, data) for every buffer that is due."""
+    ripe = []
+    while _buffer_deadlines and _buffer_deadlines[0][0] <= now:
+        _, key, started = heapq.heappop(_buffer_deadlines)
+        data = news_buffer.get(key)
+        if data is not None and data['start_time'] == started:
+            ripe.append((key, news_buffer.pop(key)))
+    return ripe
 
 # Banner insertion counter
 post_counter = 0
@@ -349,38 +373,47 @@ def get_summary_state() -> Dict[str, Any]:
     return data
 
 
-def save_summary_state(state: Dict[str, Any]):
+def _summary_doc(state: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "day": state.get("day", eat_today_str()),
+        "items": state.get("items", [])[-MAX_SUMMARY_ITEMS:],
+        "posted_sessions": state.get("posted_sessions", []),
+        "deploy_done": state.get("deploy_done", False),
+    }
+
+
+def save_summary_state(state: Dict[str, Any]) -> bool:
     try:
-        db.collection('bot_state').document('daily_summary').set({
-            "day": state.get("day", eat_today_str()),
-            "items": state.get("items", [])[-MAX_SUMMARY_ITEMS:],
-            "posted_sessions": state.get("posted_sessions", []),
-            "deploy_done": state.get("deploy_done", False),
-        }, merge=False)
+        db.collection('bot_state').document('daily_summary').set(
+            _summary_doc(state), merge=False
+        )
+        return True
     except Exception as e:
         logging.error(f"❌ Summary state save error: {e}")
+        return False
+
+
+# Items posted this cycle, written to Firestore in ONE read + write by
+# flush_state() instead of a read + write per post.
+_pending_summary_items: List[Dict[str, Any]] = []
 
 
 def log_summary_item(som: str, flag: str = "", importance: str = "Low", iran: bool = False):
     """
-    Append a posted headline to today's summary log. Called after each
-    live/cluster post so the session recap can pull from it.
+    Queue a posted headline for today's summary log. Called after each
+    live/cluster post so the session recap can pull from it; the queue is
+    persisted once per cycle by flush_state().
     """
     som = (som or "").strip()
     if not som:
         return
-    try:
-        state = get_summary_state()
-        state["items"].append({
-            "ts": time.time(),
-            "som": som,
-            "flag": flag or "",
-            "imp": importance or "Low",
-            "iran": bool(iran),
-        })
-        save_summary_state(state)
-    except Exception as e:
-        logging.error(f"❌ log_summary_item error: {e}")
+    _pending_summary_items.append({
+        "ts": time.time(),
+        "som": som,
+        "flag": flag or "",
+        "imp": importance or "Low",
+        "iran": bool(iran),
+    })
 
 
 SUMMARY_SYSTEM_PROMPT = """You are the HMM News Somali market analyst. You receive a list of today's news headlines that were posted to the channel since 00:00 EAT. Produce a SHORT, clean, bulleted recap in Somali.
@@ -418,35 +451,30 @@ async def build_session_bullets(items: List[Dict[str, Any]]) -> List[str]:
     joined = "\n".join(lines)
 
     try:
-        async with httpx.AsyncClient(timeout=40.0) as http_client:
-            client = AsyncOpenAI(api_key=OPENAI_API_KEY, http_client=http_client)
-            resp = await client.chat.completions.create(
-                model=AI_MODEL,
-                messages=[
-                    {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
-                    {"role": "user", "content": f"Today's posted headlines:\n{joined}\n\nWrite the short Somali bullet recap now."}
-                ],
-                temperature=0.4,
-                max_tokens=600,
-            )
-            raw = resp.choices[0].message.content.strip()
-            raw = re.sub(r"^```(?:\w+)?\s*", "", raw)
-            raw = re.sub(r"\s*```$", "", raw)
-
-            bullets = []
-            for ln in raw.splitlines():
-                ln = ln.strip()
-                if not ln:
-                    continue
-                # Normalize any bullet style to "• "
-                ln = re.sub(r"^[\-\*•·]\s*", "", ln)
-                ln = apply_glossary(ln)
-                ln = apply_currency_codes(ln)
-                ln = fix_somali_output(ln)
-                bullets.append(f"• {ln}")
-            if not bullets:
-                raise ValueError("empty AI summary")
-            return bullets[:8]
+        resp = await chat_completion(
+            model=SUMMARY_MODEL,
+            messages=[
+                {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+                {"role": "user", "content": f"Today's posted headlines:\n{joined}\n\nWrite the short Somali bullet recap now."}
+            ],
+            temperature=0.4,
+            max_tokens=600,
+            timeout=40.0,
+        )
+        raw = strip_code_fence(resp.choices[0].message.content.strip())
+
+        bullets = []
+        for ln in raw.splitlines():
+            ln = ln.strip()
+            if not ln:
+                continue
+            # Normalize any bullet style to "• "
+            ln = re.sub(r"^[\-\*•·]\s*", "", ln)
+            ln = polish_somali(ln)
+            bullets.append(f"• {ln}")
+        if not bullets:
+            raise ValueError("empty AI summary")
+        return bullets[:8]
     except Exception as e:
         logging.error(f"❌ Summary AI error: {e}")
         # Fallback: raw last-10 bullets (no directional bias)
@@ -467,19 +495,6 @@ def format_session_summary(info: Dict[str, str], bullets: List[str], now: dateti
     return f"{head}\n{sep}\n{body}\n{sep}\n📡 HMM News"
 
 
-async def _post_summary(bot, message: str, category: str = "NO_MARKET_IMPACT"):
-    try:
-        await bot.send_message(
-            chat_id=TELEGRAM_CHANNEL_ID,
-            text=message,
-            parse_mode="Markdown",
-            disable_web_page_preview=True,
-        )
-        await send_to_facebook(message)
-    except Exception as e:
-        logging.error(f"❌ Summary post error: {e}")
-
-
 async def maybe_post_session_summaries(bot):
     """
     Called every loop. Posts the latest due session summary (if any).
@@ -489,7 +504,9 @@ async def maybe_post_session_summaries(bot):
     now = eat_now()
     minutes_now = now.hour * 60 + now.minute
 
-    state = get_summary_state()
+    # firebase_admin is blocking gRPC — keep it off the event loop
+    await asyncio.to_thread(flush_state)  # recap must see everything posted so far
+    state = await asyncio.to_thread(get_summary_state)
     posted = set(state.get("posted_sessions", []))
 
     due = [k for k in SESSION_SEQUENCE
@@ -503,40 +520,41 @@ async def maybe_post_session_summaries(bot):
     logging.info(f"📋 Posting session summary: {target_key} ({info['name']})")
     bullets = await build_session_bullets(state.get("items", []))
     msg = format_session_summary(info, bullets, now)
-    await _post_summary(bot, msg)
+    await broadcast(bot, msg, label="Summary", disable_web_page_preview=True)
 
     # Mark all due sessions as posted
     for k in due:
         if k not in state["posted_sessions"]:
             state["posted_sessions"].append(k)
-    save_summary_state(state)
+    await asyncio.to_thread(save_summary_state, state)
 
 
-async def force_deploy_summary(bot):
+async def force_deploy_summary(bot, feeds: Optional[List[tuple]] = None):
     """
     FIRST DEPLOYMENT: post a one-time recap of the last 24 hours pulled
     from the feeds. Runs once per day (guarded by deploy_done) so a
     container restart on the same day won't repost it.
     """
-    state = get_summary_state()
+    state = await asyncio.to_thread(get_summary_state)
     if state.get("deploy_done"):
         logging.info("⏭️ Deploy summary already done today — skipping.")
         return
 
+    if feeds is None:
+        feeds = await fetch_feeds()
     cutoff = time.time() - 24 * 3600
     titles = []
-    for url in RSS_URLS:
+    for _, feed in feeds:
         try:
-            feed = feedparser.parse(url)
             for e in feed.entries:
                 pub = e.get("published_parsed")
-                ts = time.mktime(pub) if pub else 0.0
+                ts = calendar.timegm(pub) if pub else 0.0
                 if ts < cutoff:
                     continue
                 raw = e.title or ""
                 if not raw:
                     continue
-                if any(k in raw.lower() for k in EXCLUSION_KEYWORDS):
+                if should_exclude_headline(raw):
                     continue
                 if should_skip_regional(raw):
                     continue
@@ -556,7 +574,7 @@ async def force_deploy_summary(bot):
     info = {"emoji": "🚀", "name": "Koobitaanka 24-Saac ee La Soo Dhaafay",
             "window": "24 saac la soo dhaafay"}
     msg = format_session_summary(info, bullets, now)
-    await _post_summary(bot, msg)
+    await broadcast(bot, msg, label="Summary", disable_web_page_preview=True)
 
     # Mark deploy done AND mark already-passed sessions as posted so we
     # don't immediately fire a redundant session summary right after deploy.
@@ -565,218 +583,204 @@ async def force_deploy_summary(bot):
         if minutes_now >= SESSIONS[k]["minute"] and k not in state["posted_sessions"]:
             state["posted_sessions"].append(k)
     state["deploy_done"] = True
-    save_summary_state(state)
+    await asyncio.to_thread(save_summary_state, state)
 
 # ==================================================================
 # 6. HELPER FUNCTIONS
 # ==================================================================
 
+def feed_key(url: str) -> str:
+    """Short stable id for a feed URL (safe as a Firestore map key)."""
+    return hashlib.blake2b(url.encode("utf-8"), digest_size=8).hexdigest()
+
+
+# In-memory copy of bot_state/forex_state. The bot is the only writer, so
+# after the first read every cycle can use this instead of a Firestore
+# round-trip; save_bot_state() keeps it in sync and flush_state() persists it.
+_bot_state_cache: Optional[Dict[str, Any]] = None
+_bot_state_dirty = False  # cache holds changes Firestore hasn't accepted yet
+_bot_state_saved_at = 0.0  # monotonic time of the last successful write
+# The cache is the source of truth between writes; Firestore gets at most
+# one write per interval (plus a forced one on shutdown). Losing a few
+# seconds of state in a crash is covered by the startup fast-forward.
+BOT_STATE_PERSIST_SECONDS = 30.0
+# save_bot_state / flush_state run on worker threads (the Firestore calls
+# block); this keeps the cache update and flush snapshot from interleaving.
+_flush_lock = threading.Lock()
+
+
+def _default_bot_state() -> Dict[str, Any]:
+    return {"last_link": None, "last_time": 0.0, "processed_links": [], "processed_titles": [], "feed_times": {}}
+
+
 def get_bot_state():
+    global _bot_state_cache
+    if _bot_state_cache is not None:
+        return _bot_state_cache
     try:
         doc = db.collection('bot_state').document('forex_state').get()
-        if doc.exists:
-            data = doc.to_dict()
-            if "processed_links" not in data:
-                data["processed_links"] = []
-            if "processed_titles" not in data:
-                data["processed_titles"] = []
-            return data
-        return {"last_link": None, "last_time": 0.0, "processed_links": [], "processed_titles": []}
+        data = doc.to_dict() if doc.exists else {}
+        for k, v in _default_bot_state().items():
+            data.setdefault(k, v)
+        _bot_state_cache = data
+        return data
     except Exception:
-        return {"last_link": None, "last_time": 0.0, "processed_links": [], "processed_titles": []}
+        # Not cached — try Firestore again next cycle
+        return _default_bot_state()
+
+
+# How many recent links / title fingerprints are kept for dedup.
+SEEN_HISTORY_SIZE = 500
+
+
+def remember(seen: OrderedDict, key: str):
+    """Add key to an ordered dedup history as the NEWEST entry."""
+    seen[key] = None
+    seen.move_to_end(key)
+    if len(seen) > SEEN_HISTORY_SIZE:
+        seen.popitem(last=False)
+
+
+def save_bot_state(last_link, last_time, processed_links=None, processed_titles=None, feed_times=None):
+    update_data = {"last_link": last_link, "last_time": last_time}
+    if processed_links is not None:
+        update_data["processed_links"] = processed_links[-SEEN_HISTORY_SIZE:]
+    if processed_titles is not None:
+        # Keep the newest title fingerprints
+        update_data["processed_titles"] = processed_titles[-SEEN_HISTORY_SIZE:]
+    if feed_times is not None:
+        # Per-feed high-water marks {feed_key: last_time}
+        update_data["feed_times"] = dict(feed_times)
+    global _bot_state_dirty
+    if _bot_state_cache is None:
+        # No cached copy to hold the update — write it through now
+        try:
+            db.collection('bot_state').document('forex_state').set(
+                update_data, merge=True
+            )
+        except Exception as e:
+            logging.error(f"DB Error: {e}")
+        return
+    # Quiet cycle: nothing changed since the last write
+    if not _bot_state_dirty and all(_bot_state_cache.get(k) == v for k, v in update_data.items()):
+        return
+    with _flush_lock:  # don't let a flush snapshot a half-applied update
+        _bot_state_cache.update(update_data)
+        _bot_state_dirty = True
 
 
-def save_bot_state(last_link, last_time, processed_links=None, processed_titles=None):
-    try:
-        update_data = {"last_link": last_link, "last_time": last_time}
-        if processed_links is not None:
-            update_data["processed_links"] = processed_links[-200:]
-        if processed_titles is not None:
-            # Keep last 200 title fingerprints
-            update_data["processed_titles"] = processed_titles[-200:]
-        db.collection('bot_state').document('forex_state').set(
-            update_data, merge=True
+def flush_state(force: bool = False):
+    """
+    Persist everything the cycle left pending — the cached bot_state (at
+    most once per BOT_STATE_PERSIST_SECONDS unless forced) and the queued
+    summary items — in ONE Firestore batch commit instead of a write each.
+    """
+    global _bot_state_dirty, _bot_state_saved_at
+    # Runs on worker threads; a shutdown flush can overlap one still in
+    # flight from the loop, so only one may snapshot + trim the queue.
+    with _flush_lock:
+        state_due = (
+            _bot_state_dirty and _bot_state_cache is not None
+            and (force or time.monotonic() - _bot_state_saved_at >= BOT_STATE_PERSIST_SECONDS)
         )
-    except Exception as e:
-        logging.error(f"DB Error: {e}")
+        queued = len(_pending_summary_items)
+        if not state_due and not queued:
+            return
+        try:
+            batch = db.batch()
+            if state_due:
+                payload = {k: _bot_state_cache.get(k, v) for k, v in _default_bot_state().items()}
+                batch.set(db.collection('bot_state').document('forex_state'), payload, merge=True)
+            if queued:
+                summary = get_summary_state()
+                summary["items"].extend(_pending_summary_items[:queued])
+                batch.set(db.collection('bot_state').document('daily_summary'),
+                          _summary_doc(summary), merge=False)
+            batch.commit()
+        except Exception as e:
+            logging.error(f"DB Error: {e}")  # still pending → retried next flush
+            return
+        if state_due:
+            _bot_state_dirty = False
+            _bot_state_saved_at = time.monotonic()
+        del _pending_summary_items[:queued]
 
 
-def normalize_title(title: str) -> str:
-    """
-    Create a normalized fingerprint from a headline for dedup.
-    Strips punctuation, whitespace, lowercases, and removes numbers
-    so that 'US PCE MoM: 0.3% (exp 0.3%, prev 0.4%)' and
-    'US PCE MoM: 0.3% (Exp 0.3%, Prev 0.4%)' match.
-    Also strips common prefixes like 'FinancialJuice:'.
-    """
-    t = title.lower().strip()
-    # Remove source prefix
-    t = re.sub(r"^[^:]+:\s*", "", t)
-    # Remove all numbers and % signs (the data values change but the indicator is the same)
-    t = re.sub(r"[\d.%]+", "", t)
-    # Remove punctuation and extra whitespace
-    t = re.sub(r"[^\w\s]", "", t)
-    t = re.sub(r"\s+", " ", t).strip()
-    return t
-
-
-def get_flag_and_impact(text):
-    flag = None
-    impact = None
-    detected_currency_code = "USD"
-
-    for k, f in TARGET_CURRENCIES.items():
-        if re.search(r"\b" + re.escape(k) + r"\b", text, re.IGNORECASE):
-            flag = f
-            if   f == "🇺🇸": detected_currency_code = "USD"
-            elif f == "🇪🇺": detected_currency_code = "EUR"
-            elif f == "🇯🇵": detected_currency_code = "JPY"
-            elif f == "🇬🇧": detected_currency_code = "GBP"
-            elif f == "🇨🇦": detected_currency_code = "CAD"
-            elif f == "🇦🇺": detected_currency_code = "AUD"
-            elif f == "🇳🇿": detected_currency_code = "NZD"
-            elif f == "🇨🇭": detected_currency_code = "CHF"
-            break
-
-    for k in RED_FOLDER_KEYWORDS:
-        if re.search(r"\b" + re.escape(k) + r"\b", text, re.IGNORECASE):
-            impact = "🔴"
-            break
-    if not impact:
-        for k in ORANGE_FOLDER_KEYWORDS:
-            if re.search(r"\b" + re.escape(k) + r"\b", text, re.IGNORECASE):
-                impact = "🟠"
-                break
-
-    return flag, impact, detected_currency_code
-
-
-def should_buffer(text):
-    for k in CLUSTER_KEYWORDS:
-        if re.search(r"\b" + re.escape(k) + r"\b", text, re.IGNORECASE):
-            return True
-    return False
-
-
-def clean_title(t):
-    t = re.sub(r"[\U0001F1E6-\U0001F1FF]{2}:?\s*", "", t)
-    t = re.sub(r"^[^:]+:\s*", "", t).strip()
-    return t
-
-
-def apply_glossary(text):
-    # Protect Somali phrases that contain words colliding with English glossary keys.
-    # "Cad" (white/clear) collides with CAD currency; "Aqalka Cad" must survive intact.
-    protected = [
-        (r"Aqalka\s+Cad", "AQALKA_TEMP_PLACEHOLDER"),
-        (r"\bsi\s+cad\b", "SI_CAD_TEMP_PLACEHOLDER"),       # "clearly"
-        (r"\bsi\s+cadi?\b", "SI_CADI_TEMP_PLACEHOLDER"),     # "clearly" variant
-        (r"\bmid\s+cad\b", "MID_CAD_TEMP_PLACEHOLDER"),      # "a clear one"
-    ]
-    for pat, placeholder in protected:
-        text = re.sub(pat, placeholder, text, flags=re.IGNORECASE)
-
-    for eng, som in GLOSSARY.items():
-        pattern = re.compile(r"\b" + re.escape(eng) + r"\b", re.IGNORECASE)
-        text = pattern.sub(som, text)
-
-    # Restore protected phrases
-    text = text.replace("AQALKA_TEMP_PLACEHOLDER", "Aqalka Cad")
-    text = text.replace("SI_CAD_TEMP_PLACEHOLDER", "si cad")
-    text = text.replace("SI_CADI_TEMP_PLACEHOLDER", "si cad")
-    text = text.replace("MID_CAD_TEMP_PLACEHOLDER", "mid cad")
-    return text
-
-
-# Currency codes handled SEPARATELY with case-sensitive matching.
-# Only UPPERCASE ticker symbols get translated — lowercase forms are
-# either Somali words ("cad" = white) or unrelated tokens.
-CURRENCY_CODE_MAP = {
-    "USD": "doollar Mareykanka",
-    "EUR": "yuuro",
-    "JPY": "yen-ka Japan",
-    "GBP": "gini Ingiriis",
-    "CHF": "franka Swiss-ka",
-    "CAD": "doollar Kanada",
-    "AUD": "doollar Australia",
-    "NZD": "doollar New Zealand",
-}
+FEED_TIMEOUT_SECONDS = 10.0
 
 
-def apply_currency_codes(text):
-    """
-    Replace UPPERCASE currency tickers with Somali names.
-    Case-sensitive on purpose: 'CAD' becomes 'doollar Kanada',
-    but lowercase 'cad' (Somali for 'white/clear') is left alone.
-    Skips common trading terms (XAUUSD, EURUSD, DXY, etc.) where
-    currency codes are part of an instrument name.
-    """
-    # Protect compound trading instruments first (XAUUSD, EURUSD, USDJPY...)
-    # so we don't mangle them
-    instrument_pattern = re.compile(
-        r"\b([A-Z]{3,6}/?[A-Z]{0,4})\b"
-    )
-    instruments = []
-    def stash_instrument(m):
-        token = m.group(0)
-        # only stash if it actually contains a currency code AND is compound
-        if len(token) >= 6 or "/" in token or token in {"DXY", "VIX"}:
-            instruments.append(token)
-            return f"__INSTR_{len(instruments)-1}__"
-        return token
-    text = instrument_pattern.sub(stash_instrument, text)
+# url → (etag, last-modified) from the previous successful fetch, so the
+# polling loop can send a conditional GET and skip unchanged feeds.
+_feed_validators: Dict[str, tuple] = {}
 
-    # Now replace standalone uppercase codes
-    for code, som in CURRENCY_CODE_MAP.items():
-        text = re.sub(r"\b" + code + r"\b", som, text)
+# url → monotonic time until which the feed's Cache-Control max-age says
+# it won't change. Polls skip such feeds entirely (no request at all).
+# Capped so a long max-age can't hold back breaking news.
+_feed_fresh_until: Dict[str, float] = {}
+FEED_MAX_FRESH_SECONDS = 60
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
 
-    # Restore instruments
-    for i, inst in enumerate(instruments):
-        text = text.replace(f"__INSTR_{i}__", inst)
 
-    return text
+def _remember_freshness(url: str, cache_control: Optional[str]):
+    cc = (cache_control or "").lower()
+    m = _MAX_AGE_RE.search(cc)
+    if not m or "no-cache" in cc or "no-store" in cc:
+        _feed_fresh_until.pop(url, None)
+        return
+    ttl = min(int(m.group(1)), FEED_MAX_FRESH_SECONDS)
+    _feed_fresh_until[url] = time.monotonic() + ttl
 
 
-def fix_somali_output(text):
+async def fetch_feed(url: str, conditional: bool = False):
     """
-    Post-process AI-generated Somali text to fix recurring mistakes:
-    1. Trump must always be 'Madaxweynaha' (current president), never 'hore' (former).
-    2. Interest rate must always use 'dulsaar', never 'danaha' or 'ribada'.
+    Download one feed asynchronously and parse the bytes in memory.
+    With conditional=True, send If-None-Match / If-Modified-Since and
+    return an empty feed on 304 — nothing is downloaded or parsed.
     """
-    # --- TRUMP FIXES ---
-    # "Madaxweynihii hore" / "madaxwaynihii hore" → "Madaxweynaha"
-    text = re.sub(r"[Mm]adaxweyni?hii\s+hore", "Madaxweynaha", text)
-    # "Madaxweynaha hore" → "Madaxweynaha"
-    text = re.sub(r"Madaxweynaha\s+hore", "Madaxweynaha", text, flags=re.IGNORECASE)
-    # "Donald Trump madaxweynihii hore" patterns
-    text = re.sub(r"madaxweyne\s+hore", "Madaxweynaha", text, flags=re.IGNORECASE)
-    # "ex-president" style references
-    text = re.sub(r"madaxweynihii\s+hore\s+ee\s+Mareykanka", "Madaxweynaha Mareykanka", text, flags=re.IGNORECASE)
-
-    # --- INTEREST RATE FIXES ---
-    # "heerka danaha" → "heerka dulsaar"
-    text = re.sub(r"heerka\s+danaha", "heerka dulsaar", text, flags=re.IGNORECASE)
-    # "heerarka danaha" → "heerarka dulsaar"
-    text = re.sub(r"heerarka\s+danaha", "heerarka dulsaar", text, flags=re.IGNORECASE)
-    # "heerka ribada" → "heerka dulsaar"
-    text = re.sub(r"heerka\s+ribada", "heerka dulsaar", text, flags=re.IGNORECASE)
-    # "heerarka ribada" → "heerarka dulsaar"
-    text = re.sub(r"heerarka\s+ribada", "heerarka dulsaar", text, flags=re.IGNORECASE)
-    # "heerka faa'idada" → "heerka dulsaar"
-    text = re.sub(r"heerka\s+faa['\u2019]?idada", "heerka dulsaar", text, flags=re.IGNORECASE)
-    # "heerarka faa'idada" → "heerarka dulsaar"
-    text = re.sub(r"heerarka\s+faa['\u2019]?idada", "heerarka dulsaar", text, flags=re.IGNORECASE)
-    # "qiimaha danaha" → "heerka dulsaar"
-    text = re.sub(r"qiimaha\s+danaha", "heerka dulsaar", text, flags=re.IGNORECASE)
-    # Catch "dana" standalone when preceded by rate-related context
-    text = re.sub(r"heerka\s+dana\b", "heerka dulsaar", text, flags=re.IGNORECASE)
-    text = re.sub(r"heerarka\s+dana\b", "heerarka dulsaar", text, flags=re.IGNORECASE)
-
-    return text
-
-
-def strip_markdown(text):
-    return text.replace("**", "").replace("__", "")
+    headers = {"User-Agent": feedparser.USER_AGENT}
+    etag, modified = _feed_validators.get(url, (None, None))
+    if conditional:
+        if etag:
+            headers["If-None-Match"] = etag
+        if modified:
+            headers["If-Modified-Since"] = modified
+    resp = await HTTP_CLIENT.get(url, timeout=FEED_TIMEOUT_SECONDS, headers=headers)
+    _remember_freshness(url, resp.headers.get("Cache-Control"))
+    if resp.status_code == 304:
+        return feedparser.FeedParserDict(entries=[], status=304)
+    resp.raise_for_status()
+    _feed_validators[url] = (resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+    # feedparser is pure-Python XML work — run it in a worker thread so
+    # in-flight OpenAI / Telegram calls keep moving while a big feed parses.
+    return await asyncio.to_thread(
+        feedparser.parse, resp.content, response_headers=dict(resp.headers)
+    )
+
+
+async def fetch_feeds(conditional: bool = False) -> List[tuple]:
+    """
+    Fetch + parse every RSS feed concurrently over the shared async
+    client, so the fetch phase takes max(feed latency) instead of the
+    sum and never blocks the event loop. Returns (url, feed) pairs;
+    feeds that fail are dropped for this cycle. conditional=True is for
+    the polling loop only — unchanged feeds come back empty, and feeds
+    still inside their max-age window aren't requested at all.
+    """
+    urls = RSS_URLS
+    if conditional:
+        now = time.monotonic()
+        urls = [u for u in RSS_URLS if _feed_fresh_until.get(u, 0.0) <= now]
+    results = await asyncio.gather(
+        *[fetch_feed(url, conditional) for url in urls],
+        return_exceptions=True,
+    )
+    feeds = []
+    for url, feed in zip(urls, results):
+        if isinstance(feed, BaseException):
+            logging.warning(f"⚠️ Feed fetch failed ({url}): {feed!r}")
+            continue
+        feeds.append((url, feed))
+    return feeds
 
 
 # ==================================================================
@@ -893,10 +897,89 @@ DIRECTION allowed: Bullish, Bearish
 Remember: impacts ONLY for MACRO_DATA / CENTRAL_BANK / MONETARY_POLICY. Everything else → []."""
 
 
+# --- ANALYSIS CACHE ---
+# The same headline regularly shows up again (mirrored feeds, republished
+# items with a new URL). Remember recent AI results so a repeat costs a
+# dict lookup instead of an OpenAI round-trip. In-memory LRU only — the
+# container filesystem is ephemeral. Entries expire after an hour so a
+# stale read of a developing story doesn't stick around all day.
+ANALYSIS_CACHE_SIZE = 2000
+ANALYSIS_CACHE_TTL_SECONDS = 3600
+_analysis_cache: "OrderedDict[str, tuple]" = OrderedDict()  # key → (stored_at, analysis)
+
+
+def _cache_key(*parts: str) -> str:
+    # Collapse whitespace too — republished copies often differ only in
+    # double spaces / stray newlines, and those should still hit.
+    raw = "\x1f".join(" ".join((p or "").split()).lower() for p in parts)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _cache_get(key: str) -> Optional[Dict[str, Any]]:
+    hit = _analysis_cache.get(key)
+    if hit is None:
+        return None
+    stored_at, value = hit
+    if time.monotonic() - stored_at > ANALYSIS_CACHE_TTL_SECONDS:
+        del _analysis_cache[key]
+        return None
+    _analysis_cache.move_to_end(key)
+    # Callers mutate the analysis (Iran override), so hand out a copy
+    return copy.deepcopy(value)
+
+
+def _cache_put(key: str, value: Dict[str, Any]):
+    _analysis_cache[key] = (time.monotonic(), copy.deepcopy(value))
+    _analysis_cache.move_to_end(key)
+    while len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+        _analysis_cache.popitem(last=False)
+
+
+def _sanitize_analysis(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate one AI analysis object and apply the Somali text fixes."""
+    # Validate category
+    cat = data.get("category", "NO_MARKET_IMPACT")
+    if cat not in VALID_CATEGORIES:
+        cat = "NO_MARKET_IMPACT"
+    data["category"] = cat
+
+    # Validate / sanitize impacts
+    impacts = data.get("impacts", [])
+    if not isinstance(impacts, list):
+        impacts = []
+    clean_impacts = []
+    for imp in impacts:
+        if not isinstance(imp, dict):
+            continue
+        asset = str(imp.get("asset", "")).strip()
+        direction = str(imp.get("direction", "")).strip().capitalize()
+        if asset in VALID_ASSETS and direction in VALID_DIRECTIONS:
+            clean_impacts.append({"asset": asset, "direction": direction})
+    # ENFORCE: directional impacts ONLY for macro / central-bank /
+    # monetary-policy news. Geopolitics, war, diplomacy, politics, and
+    # general headlines NEVER get a directional call — headline moves
+    # are unreliable and the bias is reserved for macro sentiment.
+    if cat not in MARKET_SIGNAL_CATEGORIES:
+        clean_impacts = []
+    data["impacts"] = clean_impacts
+
+    # Apply glossary + style fixes to Somali text
+    data["headline_somali"] = polish_somali(data.get("headline_somali", ""))
+    data["smart_header"] = data.get("smart_header", "WARARKA CAALAMKA")
+    return data
+
+
 async def classify_and_analyze(headline: str, currency_code: str = "USD") -> Dict[str, Any]:
     """
     Single AI call that classifies, translates, analyzes, and structures the news.
+    Results are cached per (headline, currency) so repeats skip the AI call.
     """
+    cache_key = _cache_key(headline, currency_code)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        logging.info(f"♻️ Analysis cache hit: {headline[:60]}")
+        return cached
+
     default_result = {
         "category": "NO_MARKET_IMPACT",
         "headline_somali": "",
@@ -906,67 +989,32 @@ async def classify_and_analyze(headline: str, currency_code: str = "USD") -> Dic
     }
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as http_client:
-            client = AsyncOpenAI(api_key=OPENAI_API_KEY, http_client=http_client)
-
-            user_content = (
-                f"Headline: {headline}\n"
-                f"Detected currency context: {currency_code}\n"
-                f"Write this in your Somali style. List ALL affected assets in 'impacts'. "
-                f"Respond in JSON only."
-            )
-
-            resp = await client.chat.completions.create(
-                model=AI_MODEL,
-                messages=[
-                    {"role": "system", "content": CLASSIFICATION_SYSTEM_PROMPT},
-                    {"role": "user", "content": user_content}
-                ],
-                temperature=0.3,
-                max_tokens=500,
-            )
-
-            raw_output = resp.choices[0].message.content.strip()
+        user_content = (
+            f"Headline: {headline}\n"
+            f"Detected currency context: {currency_code}\n"
+            f"Write this in your Somali style. List ALL affected assets in 'impacts'. "
+            f"Respond in JSON only."
+        )
 
-            # Clean potential markdown fences
-            raw_output = re.sub(r"^```(?:json)?\s*", "", raw_output)
-            raw_output = re.sub(r"\s*```$", "", raw_output)
+        resp = await chat_completion(
+            model=AI_MODEL,
+            messages=[
+                {"role": "system", "content": CLASSIFICATION_SYSTEM_PROMPT},
+                {"role": "user", "content": user_content}
+            ],
+            temperature=0.3,
+            max_tokens=500,
+            response_format={"type": "json_object"},
+            timeout=30.0,
+        )
 
-            data = json.loads(raw_output)
+        # Clean potential markdown fences
+        raw_output = strip_code_fence(resp.choices[0].message.content.strip())
 
-            # Validate category
-            cat = data.get("category", "NO_MARKET_IMPACT")
-            if cat not in VALID_CATEGORIES:
-                cat = "NO_MARKET_IMPACT"
-            data["category"] = cat
+        data = _sanitize_analysis(_json_loads(raw_output))
 
-            # Validate / sanitize impacts
-            impacts = data.get("impacts", [])
-            if not isinstance(impacts, list):
-                impacts = []
-            clean_impacts = []
-            for imp in impacts:
-                if not isinstance(imp, dict):
-                    continue
-                asset = str(imp.get("asset", "")).strip()
-                direction = str(imp.get("direction", "")).strip().capitalize()
-                if asset in VALID_ASSETS and direction in VALID_DIRECTIONS:
-                    clean_impacts.append({"asset": asset, "direction": direction})
-            # ENFORCE: directional impacts ONLY for macro / central-bank /
-            # monetary-policy news. Geopolitics, war, diplomacy, politics, and
-            # general headlines NEVER get a directional call — headline moves
-            # are unreliable and the bias is reserved for macro sentiment.
-            if cat not in MARKET_SIGNAL_CATEGORIES:
-                clean_impacts = []
-            data["impacts"] = clean_impacts
-
-            # Apply glossary + style fixes to Somali text
-            data["headline_somali"] = apply_glossary(data.get("headline_somali", ""))
-            data["headline_somali"] = apply_currency_codes(data["headline_somali"])
-            data["headline_somali"] = fix_somali_output(data["headline_somali"])
-            data["smart_header"] = data.get("smart_header", "WARARKA CAALAMKA")
-
-            return data
+        _cache_put(cache_key, data)
+        return data
 
     except json.JSONDecodeError as e:
         logging.error(f"❌ AI JSON parse error: {e}")
@@ -976,65 +1024,147 @@ async def classify_and_analyze(headline: str, currency_code: str = "USD") -> Dic
         return default_result
 
 
-async def summarize_cluster(headlines: List[str], currency_code: str = "USD") -> Dict[str, Any]:
+# Max headlines per batched classification request (keeps the reply
+# comfortably inside max_tokens)
+ANALYSIS_BATCH_SIZE = 10
+
+
+async def _classify_chunk(items: List[tuple]) -> Dict[int, Dict[str, Any]]:
     """
-    Summarize a cluster of buffered headlines with Saki's voice.
+    One chat completion for several (headline, currency) pairs. Returns
+    {index: analysis} for every item the model answered; anything missing
+    is left for the caller to retry on its own.
     """
-    joined = "\n".join(f"- {h}" for h in headlines)
+    numbered = "\n".join(
+        f"{i}. [{cur}] {headline}" for i, (headline, cur) in enumerate(items, 1)
+    )
+    user_content = (
+        f"Headlines (detected currency context in brackets):\n{numbered}\n\n"
+        f"Handle EACH headline independently exactly as instructed above. "
+        f'Respond in JSON only: {{"results": [{{"id": <headline number>, '
+        f'"category": ..., "headline_somali": ..., "importance": ..., '
+        f'"smart_header": ..., "impacts": [...]}}, ...]}} — one object per headline.'
+    )
 
-    try:
-        async with httpx.AsyncClient(timeout=30.0) as http_client:
-            client = AsyncOpenAI(api_key=OPENAI_API_KEY, http_client=http_client)
+    resp = await chat_completion(
+        model=AI_MODEL,
+        messages=[
+            {"role": "system", "content": CLASSIFICATION_SYSTEM_PROMPT},
+            {"role": "user", "content": user_content}
+        ],
+        temperature=0.3,
+        max_tokens=300 * len(items) + 100,
+        response_format={"type": "json_object"},
+        timeout=60.0,
+    )
 
-            user_content = (
-                f"Multiple related headlines about {currency_code}:\n{joined}\n\n"
-                f"Summarize the overall theme in your Somali style. "
-                f"List ALL affected assets in 'impacts'. Respond in JSON only."
-            )
+    raw_output = strip_code_fence(resp.choices[0].message.content.strip())
 
-            resp = await client.chat.completions.create(
-                model=AI_MODEL,
-                messages=[
-                    {"role": "system", "content": CLASSIFICATION_SYSTEM_PROMPT},
-                    {"role": "user", "content": user_content}
-                ],
-                temperature=0.3,
-                max_tokens=500,
-            )
+    parsed = _json_loads(raw_output)
+    results = parsed.get("results", []) if isinstance(parsed, dict) else parsed
+    out = {}
+    for obj in results if isinstance(results, list) else []:
+        if not isinstance(obj, dict):
+            continue
+        try:
+            idx = int(obj.pop("id"))
+        except (KeyError, TypeError, ValueError):
+            continue
+        if 1 <= idx <= len(items) and obj.get("headline_somali"):
+            out[idx - 1] = _sanitize_analysis(obj)
+    return out
 
-            raw_output = resp.choices[0].message.content.strip()
-            raw_output = re.sub(r"^```(?:json)?\s*", "", raw_output)
-            raw_output = re.sub(r"\s*```$", "", raw_output)
 
-            data = json.loads(raw_output)
+async def classify_batch(items: List[tuple]) -> List[Dict[str, Any]]:
+    """
+    Classify many (headline, currency) pairs with as few AI calls as
+    possible: cached items are free, the rest go out ANALYSIS_BATCH_SIZE
+    at a time in a single request each, all chunks in flight together.
+    Items the batch reply misses (or a failed batch) fall back to
+    concurrent classify_and_analyze() calls.
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    pending = []
+    first_by_key: Dict[str, int] = {}
+    repeats: Dict[int, int] = {}  # index → earlier index with the same key
+    for i, (headline, cur) in enumerate(items):
+        key = _cache_key(headline, cur)
+        cached = _cache_get(key)
+        if cached is not None:
+            results[i] = cached
+        elif key in first_by_key:
+            # Same headline twice in one burst — ask the AI only once
+            repeats[i] = first_by_key[key]
+        else:
+            first_by_key[key] = i
+            pending.append(i)
+
+    if len(pending) > 1:
+        # Chunks are independent requests — send them all at once
+        chunks = [pending[start:start + ANALYSIS_BATCH_SIZE]
+                  for start in range(0, len(pending), ANALYSIS_BATCH_SIZE)]
+        replies = await asyncio.gather(
+            *[_classify_chunk([items[i] for i in chunk]) for chunk in chunks],
+            return_exceptions=True,
+        )
+        for chunk, answered in zip(chunks, replies):
+            if isinstance(answered, BaseException):
+                logging.error(f"❌ Batch analysis error: {answered}")
+                continue
+            for pos, data in answered.items():
+                i = chunk[pos]
+                _cache_put(_cache_key(*items[i]), data)
+                results[i] = data
+            logging.info(f"🧮 Batch analysis: {len(answered)}/{len(chunk)} headlines in one call")
+
+    # Stragglers: individual calls, also concurrent
+    missing = [i for i in pending if results[i] is None]
+    singles = await asyncio.gather(
+        *[classify_and_analyze(items[i][0], currency_code=items[i][1]) for i in missing]
+    )
+    for i, data in zip(missing, singles):
+        results[i] = data
+    for i, first in repeats.items():
+        results[i] = copy.deepcopy(results[first])
+    return results
 
-            cat = data.get("category", "NO_MARKET_IMPACT")
-            if cat not in VALID_CATEGORIES:
-                cat = "NO_MARKET_IMPACT"
-            data["category"] = cat
 
-            # Validate impacts
-            impacts = data.get("impacts", [])
-            if not isinstance(impacts, list):
-                impacts = []
-            clean_impacts = []
-            for imp in impacts:
-                if not isinstance(imp, dict):
-                    continue
-                asset = str(imp.get("asset", "")).strip()
-                direction = str(imp.get("direction", "")).strip().capitalize()
-                if asset in VALID_ASSETS and direction in VALID_DIRECTIONS:
-                    clean_impacts.append({"asset": asset, "direction": direction})
-            # ENFORCE: directional impacts ONLY for macro categories.
-            if cat not in MARKET_SIGNAL_CATEGORIES:
-                clean_impacts = []
-            data["impacts"] = clean_impacts
+async def summarize_cluster(headlines: Iterable[str], currency_code: str = "USD") -> Dict[str, Any]:
+    """
+    Summarize a cluster of buffered headlines with Saki's voice.
+    """
+    headlines = list(headlines)
+    cache_key = _cache_key("cluster", currency_code, *headlines)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return cached
 
-            data["headline_somali"] = apply_glossary(data.get("headline_somali", ""))
-            data["headline_somali"] = apply_currency_codes(data["headline_somali"])
-            data["headline_somali"] = fix_somali_output(data["headline_somali"])
+    joined = "\n".join(f"- {h}" for h in headlines)
 
-            return data
+    try:
+        user_content = (
+            f"Multiple related headlines about {currency_code}:\n{joined}\n\n"
+            f"Summarize the overall theme in your Somali style. "
+            f"List ALL affected assets in 'impacts'. Respond in JSON only."
+        )
+
+        resp = await chat_completion(
+            model=AI_MODEL,
+            messages=[
+                {"role": "system", "content": CLASSIFICATION_SYSTEM_PROMPT},
+                {"role": "user", "content": user_content}
+            ],
+            temperature=0.3,
+            max_tokens=500,
+            response_format={"type": "json_object"},
+            timeout=30.0,
+        )
+
+        raw_output = strip_code_fence(resp.choices[0].message.content.strip())
+
+        data = _sanitize_analysis(_json_loads(raw_output))
+        _cache_put(cache_key, data)
+        return data
 
     except Exception as e:
         logging.error(f"❌ Cluster analysis error: {e}")
@@ -1118,6 +1248,61 @@ def format_message(analysis: Dict[str, Any], flag: str = "", impact_dot: str = "
     return "\n".join(lines)
 
 
+# ==================================================================
+# 8b. TELEGRAM SENDER
+# ==================================================================
+
+TELEGRAM_MAX_CONCURRENT_SENDS = 2
+TELEGRAM_MAX_RETRIES = 3
+_telegram_send_slots = asyncio.Semaphore(TELEGRAM_MAX_CONCURRENT_SENDS)
+
+
+def build_bot() -> Bot:
+    """Bot with a pooled HTTPX transport instead of PTB's single connection."""
+    request = HTTPXRequest(
+        connection_pool_size=8,
+        connect_timeout=5.0,
+        read_timeout=10.0,
+        write_timeout=20.0,  # banner photo uploads
+        pool_timeout=5.0,
+    )
+    return Bot(token=TELEGRAM_BOT_TOKEN, request=request)
+
+
+async def send_telegram(bot: Bot, **kwargs):
+    """
+    Post a message to the channel. At most TELEGRAM_MAX_CONCURRENT_SENDS
+    run at once; a flood-control RetryAfter waits exactly as long as
+    Telegram asks, and connection errors back off exponentially.
+    Timeouts are NOT retried — the message may already be delivered —
+    and neither are permanent rejections (bad Markdown, chat not found).
+    """
+    async with _telegram_send_slots:
+        for attempt in range(TELEGRAM_MAX_RETRIES + 1):
+            try:
+                return await bot.send_message(chat_id=TELEGRAM_CHANNEL_ID, **kwargs)
+            except RetryAfter as e:
+                if attempt == TELEGRAM_MAX_RETRIES:
+                    raise
+                wait = e.retry_after
+                if isinstance(wait, timedelta):
+                    wait = wait.total_seconds()
+                logging.warning(f"⏳ Telegram flood control — retrying in {wait}s")
+                await asyncio.sleep(float(wait) + 0.5)
+            except TimedOut:
+                raise
+            except (BadRequest, Forbidden):
+                # BadRequest subclasses NetworkError in PTB 21 — retrying
+                # can't fix it and would only hold a send slot
+                raise
+            except NetworkError as e:
+                if attempt == TELEGRAM_MAX_RETRIES:
+                    raise
+                wait = 2 ** attempt
+                logging.warning(f"⏳ Telegram network error ({e}) — retrying in {wait}s")
+                await asyncio.sleep(wait)
+
+
 # ==================================================================
 # 9. FACEBOOK HANDLER
 # ==================================================================
@@ -1127,33 +1312,50 @@ async def send_to_facebook(text: str, image_path: str = None):
         return
 
     try:
-        async with httpx.AsyncClient() as client:
-            if image_path and os.path.exists(image_path):
-                # Post with image
-                url = f"https://graph.facebook.com/v19.0/{FACEBOOK_PAGE_ID}/photos"
-                with open(image_path, "rb") as img:
-                    await client.post(
-                        url,
-                        data={
-                            "caption": strip_markdown(text),
-                            "access_token": FACEBOOK_ACCESS_TOKEN
-                        },
-                        files={"source": ("banner.png", img, "image/png")}
-                    )
-            else:
-                # Text-only post
-                url = f"https://graph.facebook.com/v19.0/{FACEBOOK_PAGE_ID}/feed"
-                await client.post(
+        if image_path and os.path.exists(image_path):
+            # Post with image
+            url = f"https://graph.facebook.com/v19.0/{FACEBOOK_PAGE_ID}/photos"
+            with open(image_path, "rb") as img:
+                await HTTP_CLIENT.post(
                     url,
                     data={
-                        "message": strip_markdown(text),
+                        "caption": strip_markdown(text),
                         "access_token": FACEBOOK_ACCESS_TOKEN
-                    }
+                    },
+                    files={"source": ("banner.png", img, "image/png")}
                 )
+        else:
+            # Text-only post
+            url = f"https://graph.facebook.com/v19.0/{FACEBOOK_PAGE_ID}/feed"
+            await HTTP_CLIENT.post(
+                url,
+                data={
+                    "message": strip_markdown(text),
+                    "access_token": FACEBOOK_ACCESS_TOKEN
+                }
+            )
     except Exception as e:
         logging.error(f"❌ FB Error: {e}")
 
 
+async def broadcast(bot: Bot, text: str, label: str = "Post", **tg_kwargs) -> bool:
+    """
+    Post the same message to Telegram and Facebook concurrently — they are
+    independent APIs, so there's no reason to wait for one before the other.
+    Returns True if the Telegram send went through.
+    """
+    tg_result, fb_result = await asyncio.gather(
+        send_telegram(bot, text=text, parse_mode="Markdown", **tg_kwargs),
+        send_to_facebook(text),
+        return_exceptions=True,
+    )
+    if isinstance(tg_result, BaseException):
+        logging.error(f"❌ {label} Telegram error: {tg_result}")
+    if isinstance(fb_result, BaseException):
+        logging.error(f"❌ {label} FB error: {fb_result}")
+    return not isinstance(tg_result, BaseException)
+
+
 # ==================================================================
 # 10. BANNER INSERTION LOGIC
 # ==================================================================
@@ -1192,22 +1394,32 @@ async def maybe_send_banner(bot: Bot, category: str, last_message: str = ""):
         caption = f"━━  {banner_text}  ━━"
 
     try:
-        image_path = generate_banner(
+        # Pillow render + PNG encode is CPU work — keep it off the event loop
+        image_path = await asyncio.to_thread(
+            generate_banner,
             text=banner_text,
             bg_color=color,
             output_path="/tmp/banner_latest.png"
         )
         if image_path and os.path.exists(image_path):
             # Send to Telegram — banner image WITH the last news post as caption
-            with open(image_path, "rb") as img:
-                await bot.send_photo(
-                    chat_id=TELEGRAM_CHANNEL_ID,
-                    photo=img,
-                    caption=caption,
-                    parse_mode="Markdown"
-                )
-            # Send to Facebook
-            await send_to_facebook(caption, image_path=image_path)
+            async def send_banner_photo():
+                with open(image_path, "rb") as img:
+                    await bot.send_photo(
+                        chat_id=TELEGRAM_CHANNEL_ID,
+                        photo=img,
+                        caption=caption,
+                        parse_mode="Markdown"
+                    )
+
+            # Telegram + Facebook uploads run side by side
+            tg_result, _ = await asyncio.gather(
+                send_banner_photo(),
+                send_to_facebook(caption, image_path=image_path),
+                return_exceptions=True,
+            )
+            if isinstance(tg_result, BaseException):
+                raise tg_result
             logging.info(f"🖼️ Banner sent with caption: {banner_text}")
     except Exception as e:
         logging.error(f"❌ Banner error: {e}")
@@ -1217,17 +1429,27 @@ async def maybe_send_banner(bot: Bot, category: str, last_message: str = ""):
 # 11. MAIN PROCESSING LOGIC
 # ==================================================================
 
-async def process_news_feed(bot: Bot):
-    state = get_bot_state()
+async def process_news_feed(bot: Bot) -> int:
+    """One polling cycle. Returns how many new feed entries it saw."""
+    state = await asyncio.to_thread(get_bot_state)  # cached after the first read
     last_link = state.get('last_link')
     last_time = state.get('last_time', 0.0)
-    processed_links = set(state.get('processed_links', []))
-    processed_titles = set(state.get('processed_titles', []))
+    # Ordered oldest → newest, so trimming on save drops the OLDEST entries
+    processed_links = OrderedDict.fromkeys(state.get('processed_links', []))
+    processed_titles = OrderedDict.fromkeys(state.get('processed_titles', []))
+    # Each feed keeps its own high-water mark, so a feed that publishes
+    # later than the others isn't cut off by their newer timestamps.
+    # Feeds without one yet fall back to the global last_time.
+    feed_times = dict(state.get('feed_times', {}))
 
     new_items = []
-    for url in RSS_URLS:
+    cycle_fps = set()  # fingerprints already queued THIS cycle (cross-feed dedup)
+    for url, feed in await fetch_feeds(conditional=True):
+        fkey = feed_key(url)
+        # struct_time → compare as (Y, M, D, h, m, s) tuples; converting the
+        # cutoff once beats a timestamp conversion per entry
+        feed_cutoff = time.gmtime(feed_times.get(fkey, last_time))[:6]
         try:
-            feed = feedparser.parse(url)
             for e in feed.entries:
                 link = e.get("link", "")
                 raw_title = e.title or ""
@@ -1236,41 +1458,62 @@ async def process_news_feed(bot: Bot):
                 if link and link in processed_links:
                     continue
 
+                # Skip if older than this feed's last saved timestamp —
+                # a tuple compare, so it runs before the regex-heavy
+                # title normalization below
+                pub = e.get("published_parsed")
+                if pub and tuple(pub[:6]) <= feed_cutoff:
+                    continue
+
                 # DEDUP 2: Skip if title fingerprint already seen
                 # (catches same headline republished with a new URL)
                 title_fp = normalize_title(raw_title)
                 if title_fp and title_fp in processed_titles:
                     # Still record the link so we don't re-check it
                     if link:
-                        processed_links.add(link)
+                        remember(processed_links, link)
                     logging.debug(f"⏭️ Title dedup skip: {raw_title[:60]}")
                     continue
 
-                # Also skip if older than our last saved timestamp
-                pub = e.get("published_parsed")
-                if pub and time.mktime(pub) <= last_time:
-                    continue
-
-                new_items.append(e)
+                # DEDUP 3: same story carried by more than one feed this
+                # cycle — keep the first copy, skip the AI call for the rest
+                if title_fp:
+                    if title_fp in cycle_fps:
+                        if link:
+                            remember(processed_links, link)
+                        logging.debug(f"⏭️ Cross-feed dedup skip: {raw_title[:60]}")
+                        continue
+                    cycle_fps.add(title_fp)
+
+                # Epoch computed once here and carried along (None = undated)
+                ts = calendar.timegm(pub) if pub else None
+                new_items.append((fkey, e, title_fp, ts))
         except Exception:
             pass
 
-    new_items.sort(key=lambda x: x.get("published_parsed") or time.gmtime())
+    now = time.time()
+    new_items.sort(key=lambda x: now if x[3] is None else x[3])
 
     if new_items:
         latest_timestamp = last_time
         latest_link = last_link
+        to_post = []  # filtered headlines awaiting AI analysis, in feed order
+
+        def advance_feed(fkey, ts):
+            feed_times[fkey] = max(feed_times.get(fkey, last_time), ts)
 
-        for e in new_items:
+        # Pass 1 is pure CPU: every filter runs here, before any network
+        # I/O, so only survivors ever reach OpenAI. title_fp comes from
+        # the dedup pass above rather than being recomputed.
+        for fkey, e, title_fp, ts in new_items:
             raw = e.title or ""
             link = e.get("link", "")
-            title_fp = normalize_title(raw)
 
-            if any(k in raw.lower() for k in EXCLUSION_KEYWORDS):
+            if should_exclude_headline(raw):
                 if link:
-                    processed_links.add(link)
+                    remember(processed_links, link)
                 if title_fp:
-                    processed_titles.add(title_fp)
+                    remember(processed_titles, title_fp)
                 continue
 
             # ----- REGIONAL NOISE FILTER -----
@@ -1278,9 +1521,9 @@ async def process_news_feed(bot: Bot):
             # unless Iran or major macro/US anchors are involved.
             if should_skip_regional(raw):
                 if link:
-                    processed_links.add(link)
+                    remember(processed_links, link)
                 if title_fp:
-                    processed_titles.add(title_fp)
+                    remember(processed_titles, title_fp)
                 logging.info(f"⏭️ Regional noise skipped: {raw[:80]}")
                 continue
 
@@ -1296,9 +1539,9 @@ async def process_news_feed(bot: Bot):
 
             if not flag:
                 if link:
-                    processed_links.add(link)
+                    remember(processed_links, link)
                 if title_fp:
-                    processed_titles.add(title_fp)
+                    remember(processed_titles, title_fp)
                 continue
 
             if not impact:
@@ -1306,130 +1549,147 @@ async def process_news_feed(bot: Bot):
 
             # BUFFER CHECK
             if should_buffer(raw):
-                buffer_key = f"{flag}_SPEECH_{cur_code}"
-                current_time = time.time()
-                if buffer_key not in news_buffer:
-                    news_buffer[buffer_key] = {
-                        'headlines': [],
-                        'start_time': current_time,
-                        'currency': cur_code
-                    }
-                news_buffer[buffer_key]['headlines'].append(clean_title(raw))
+                buffer_headline(f"{flag}_SPEECH_{cur_code}", clean_title(raw), cur_code)
 
                 if link:
-                    processed_links.add(link)
+                    remember(processed_links, link)
                     latest_link = link
                 if title_fp:
-                    processed_titles.add(title_fp)
-                if e.get("published_parsed"):
-                    latest_timestamp = max(latest_timestamp, time.mktime(e.get("published_parsed")))
+                    remember(processed_titles, title_fp)
+                if ts is not None:
+                    latest_timestamp = max(latest_timestamp, ts)
+                    advance_feed(fkey, ts)
                 continue
 
-            # --- UPGRADED: SINGLE AI CALL FOR CLASSIFICATION + ANALYSIS ---
+            # Survivor → queue it for the batched AI analysis below
             logging.info(f"📰 Processing ({cur_code}): {raw}")
-            title = clean_title(raw)
-
-            analysis = await classify_and_analyze(title, currency_code=cur_code)
-
-            # ----- IRAN WAR OVERRIDE -----
-            # Force the bias to Saki's playbook regardless of what the AI guessed.
-            if iran_war:
-                analysis = apply_iran_war_override(analysis)
-                logging.info(f"⚔️ Iran war override applied: Gold Bearish / Oil Bullish / DXY Bullish")
-
-            # Format the structured message
-            msg = format_message(analysis, flag=flag, impact_dot=impact)
-
-            # Send to Telegram
-            try:
-                await bot.send_message(
-                    chat_id=TELEGRAM_CHANNEL_ID,
-                    text=msg,
-                    parse_mode="Markdown",
-                    disable_web_page_preview=True
+            to_post.append({
+                "feed": fkey,
+                "title": clean_title(raw),
+                "link": link,
+                "title_fp": title_fp,
+                "flag": flag,
+                "impact": impact,
+                "cur_code": cur_code,
+                "iran_war": iran_war,
+                "ts": ts,
+            })
+
+        # --- PIPELINED AI ANALYSIS → POSTING ---
+        # All chunks are classified concurrently (batched, one call each);
+        # posting starts as soon as the first chunk is back while later
+        # chunks are still in flight. Telegram posts keep feed order;
+        # Facebook posts fan out in the background and are awaited once
+        # at the end, so a slow Graph API call never holds up the channel.
+        chunks = [to_post[i:i + ANALYSIS_BATCH_SIZE]
+                  for i in range(0, len(to_post), ANALYSIS_BATCH_SIZE)]
+        analysis_tasks = [
+            asyncio.create_task(classify_batch([(job["title"], job["cur_code"]) for job in chunk]))
+            for chunk in chunks
+        ]
+        fb_posts = []
+
+        for chunk, task in zip(chunks, analysis_tasks):
+            analyses = await task
+            for job, analysis in zip(chunk, analyses):
+                flag = job["flag"]
+
+                # ----- IRAN WAR OVERRIDE -----
+                # Force the bias to Saki's playbook regardless of what the AI guessed.
+                if job["iran_war"]:
+                    analysis = apply_iran_war_override(analysis)
+                    logging.info(f"⚔️ Iran war override applied: Gold Bearish / Oil Bullish / DXY Bullish")
+
+                # Format the structured message
+                msg = format_message(analysis, flag=flag, impact_dot=job["impact"])
+
+                # Send to Telegram (in order) + queue the Facebook post
+                try:
+                    await send_telegram(
+                        bot,
+                        text=msg,
+                        parse_mode="Markdown",
+                        disable_web_page_preview=True,
+                    )
+                except Exception as e:
+                    logging.error(f"❌ News Telegram error: {e}")
+                fb_posts.append(asyncio.create_task(send_to_facebook(msg)))
+
+                # Log to today's session summary
+                log_summary_item(
+                    analysis.get("headline_somali", ""),
+                    flag=flag,
+                    importance=analysis.get("importance", "Low"),
+                    iran=analysis.get("is_iran_war", False),
                 )
-            except Exception as e:
-                logging.error(f"❌ Telegram send error: {e}")
-
-            # Send to Facebook
-            await send_to_facebook(msg)
-
-            # Log to today's session summary
-            log_summary_item(
-                analysis.get("headline_somali", ""),
-                flag=flag,
-                importance=analysis.get("importance", "Low"),
-                iran=analysis.get("is_iran_war", False),
-            )
-
-            # Maybe insert a banner (with the last news post as caption)
-            await maybe_send_banner(bot, analysis.get("category", "NO_MARKET_IMPACT"), last_message=msg)
 
-            # Track state
-            if link:
-                processed_links.add(link)
-                latest_link = link
-            if title_fp:
-                processed_titles.add(title_fp)
-            if e.get("published_parsed"):
-                latest_timestamp = max(latest_timestamp, time.mktime(e.get("published_parsed")))
-
-        save_bot_state(
+                # Maybe insert a banner (with the last news post as caption)
+                await maybe_send_banner(bot, analysis.get("category", "NO_MARKET_IMPACT"), last_message=msg)
+
+                # Track state
+                if job["link"]:
+                    remember(processed_links, job["link"])
+                    latest_link = job["link"]
+                if job["title_fp"]:
+                    remember(processed_titles, job["title_fp"])
+                if job["ts"] is not None:
+                    latest_timestamp = max(latest_timestamp, job["ts"])
+                    advance_feed(job["feed"], job["ts"])
+
+        # send_to_facebook logs its own errors
+        await asyncio.gather(*fb_posts)
+
+        # Worker thread: a cache miss writes straight through to Firestore
+        await asyncio.to_thread(
+            save_bot_state,
             latest_link, latest_timestamp,
             processed_links=list(processed_links),
-            processed_titles=list(processed_titles)
+            processed_titles=list(processed_titles),
+            feed_times=feed_times,
         )
 
     # --- PROCESS BUFFERED CLUSTERS ---
-    current_time = time.time()
-    keys_to_delete = []
+    ready = pop_ripe_buffers(time.time())
 
-    for key, data in news_buffer.items():
-        elapsed = current_time - data['start_time']
-        count = len(data['headlines'])
+    # Ripe clusters are independent (different currency/topic buffers),
+    # so flush them all at once — wall time is the slowest cluster, not
+    # the sum. OpenAI / Telegram semaphores still bound the fan-out.
+    await asyncio.gather(*[flush_cluster(bot, key, data) for key, data in ready])
 
-        if elapsed > BUFFER_TIMEOUT_SECONDS or count >= MAX_BUFFER_SIZE:
-            cur_code = data.get('currency', 'USD')
+    return len(new_items)
 
-            # Upgraded cluster analysis
-            cluster_result = await summarize_cluster(data['headlines'], currency_code=cur_code)
-            flag_emoji = key.split("_")[0]
 
-            # Format the cluster message
-            msg = format_message(cluster_result, flag=flag_emoji, impact_dot="📣")
+async def flush_cluster(bot: Bot, key: str, data: dict):
+    """Summarize one buffered cluster and post it everywhere."""
+    try:
+        # Upgraded cluster analysis
+        cluster_result = await summarize_cluster(data['headlines'], currency_code=data.get('currency', 'USD'))
+        flag_emoji = key.split("_")[0]
 
-            try:
-                await bot.send_message(
-                    chat_id=TELEGRAM_CHANNEL_ID,
-                    text=msg,
-                    parse_mode="Markdown"
-                )
-                await send_to_facebook(msg)
-            except Exception as e:
-                logging.error(f"❌ Cluster post error: {e}")
-
-            # Log cluster to session summary
-            log_summary_item(
-                cluster_result.get("headline_somali", ""),
-                flag=flag_emoji,
-                importance=cluster_result.get("importance", "Low"),
-                iran=cluster_result.get("is_iran_war", False),
-            )
+        # Format the cluster message
+        msg = format_message(cluster_result, flag=flag_emoji, impact_dot="📣")
 
-            # Maybe insert a banner (with the last news post as caption)
-            await maybe_send_banner(bot, cluster_result.get("category", "NO_MARKET_IMPACT"), last_message=msg)
+        await broadcast(bot, msg, label="Cluster")
 
-            keys_to_delete.append(key)
+        # Log cluster to session summary
+        log_summary_item(
+            cluster_result.get("headline_somali", ""),
+            flag=flag_emoji,
+            importance=cluster_result.get("importance", "Low"),
+            iran=cluster_result.get("is_iran_war", False),
+        )
 
-    for k in keys_to_delete:
-        del news_buffer[k]
+        # Maybe insert a banner (with the last news post as caption)
+        await maybe_send_banner(bot, cluster_result.get("category", "NO_MARKET_IMPACT"), last_message=msg)
+    except Exception as e:
+        logging.error(f"❌ Cluster flush error ({key}): {e}")
 
 
 # ==================================================================
 # 12. ENTRY POINT
 # ==================================================================
 
-async def initialize_on_startup(bot: Bot):
+async def initialize_on_startup(bot: Bot, feeds: Optional[List[tuple]] = None):
     """
     STARTUP FLOOD PREVENTION
     
@@ -1443,19 +1703,21 @@ async def initialize_on_startup(bot: Bot):
     we still check whether the stored state is stale. If the feed has moved
     far ahead, we fast-forward to the latest item to avoid a flood.
     """
-    state = get_bot_state()
+    state = await asyncio.to_thread(get_bot_state)
     stored_link = state.get("last_link")
     stored_time = state.get("last_time", 0.0)
 
     # Collect ALL current feed items
+    if feeds is None:
+        feeds = await fetch_feeds()
     all_items = []
-    for url in RSS_URLS:
+    for url, feed in feeds:
+        fkey = feed_key(url)
         try:
-            feed = feedparser.parse(url)
             for e in feed.entries:
                 pub = e.get("published_parsed")
-                ts = time.mktime(pub) if pub else 0.0
-                all_items.append((ts, e))
+                ts = calendar.timegm(pub) if pub else 0.0
+                all_items.append((ts, fkey, e))
         except Exception:
             pass
 
@@ -1465,7 +1727,7 @@ async def initialize_on_startup(bot: Bot):
 
     # Sort by timestamp, newest last
     all_items.sort(key=lambda x: x[0])
-    newest_ts, newest_entry = all_items[-1]
+    newest_ts, _, newest_entry = all_items[-1]
     newest_link = newest_entry.get("link")
 
     # Check if stored state is already current (normal restart, no gap)
@@ -1474,7 +1736,7 @@ async def initialize_on_startup(bot: Bot):
         return
 
     # Count how many items are newer than stored state
-    unseen_count = sum(1 for ts, _ in all_items if ts > stored_time)
+    unseen_count = sum(1 for ts, _, _ in all_items if ts > stored_time)
     logging.info(
         f"⚠️ Startup: {unseen_count} unseen items in feed. "
         f"Skipping history — posting only the latest headline."
@@ -1488,7 +1750,7 @@ async def initialize_on_startup(bot: Bot):
     # Skip regional noise on startup too
     if should_skip_regional(raw):
         logging.info("⏭️ Latest headline is regional noise — skipping deployment post.")
-    elif not any(k in raw.lower() for k in EXCLUSION_KEYWORDS):
+    elif not should_exclude_headline(raw):
         title = clean_title(raw)
         iran_war = is_iran_war_news(raw)
         flag, _, cur_code = get_flag_and_impact(raw)
@@ -1509,25 +1771,22 @@ async def initialize_on_startup(bot: Bot):
             analysis = apply_iran_war_override(analysis)
         msg = format_message(analysis, flag=flag, impact_dot="")
 
-        try:
-            await bot.send_message(
-                chat_id=TELEGRAM_CHANNEL_ID,
-                text=msg,
-                parse_mode="Markdown",
-                disable_web_page_preview=True,
-            )
-            await send_to_facebook(msg)
+        if await broadcast(bot, msg, label="Deployment", disable_web_page_preview=True):
             logging.info("✅ Deployment test post sent successfully.")
-        except Exception as e:
-            logging.error(f"❌ Deployment post failed: {e}")
     else:
         logging.info("⏭️ Latest headline is excluded — no deployment post.")
 
     # --- Fast-forward state: save newest item AND all current links + titles ---
-    all_links = [e.get("link") for _, e in all_items if e.get("link")]
-    all_title_fps = [normalize_title(e.title or "") for _, e in all_items if e.title]
+    all_links = [e.get("link") for _, _, e in all_items if e.get("link")]
+    all_title_fps = [normalize_title(e.title or "") for _, _, e in all_items if e.title]
     all_title_fps = [fp for fp in all_title_fps if fp]  # remove empties
-    save_bot_state(newest_link, newest_ts, processed_links=all_links, processed_titles=all_title_fps)
+    feed_times = {}
+    for ts, fkey, _ in all_items:
+        feed_times[fkey] = max(feed_times.get(fkey, 0.0), ts)
+    await asyncio.to_thread(
+        save_bot_state, newest_link, newest_ts, processed_links=all_links,
+        processed_titles=all_title_fps, feed_times=feed_times,
+    )
     logging.info(
         f"✅ State fast-forwarded. link={newest_link}, "
         f"time={time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(newest_ts))}, "
@@ -1535,38 +1794,84 @@ async def initialize_on_startup(bot: Bot):
     )
 
 
+# Poll interval adapts to feed churn: fast during bursts (NFP, CPI, Fed),
+# slow when nothing is moving. Conditional GETs keep fast polls cheap.
+POLL_BURST_SECONDS = 15
+POLL_DEFAULT_SECONDS = 60
+POLL_IDLE_SECONDS = 120
+
+
+def next_poll_delay(new_count: int) -> int:
+    if new_count > 3:
+        return POLL_BURST_SECONDS
+    # Pending clusters must still flush close to BUFFER_TIMEOUT_SECONDS
+    if new_count > 0 or news_buffer:
+        return POLL_DEFAULT_SECONDS
+    return POLL_IDLE_SECONDS
+
+
 async def main():
-    bot = Bot(token=TELEGRAM_BOT_TOKEN)
-    logging.info(f"🚀 HMM News Bot Starting — Model: {AI_MODEL}")
+    bot = build_bot()
+    logging.info(f"🚀 HMM News Bot Starting — Model: {AI_MODEL} (recaps: {SUMMARY_MODEL})")
+    # Opens the pooled Telegram transport once for the whole process
+    try:
+        await bot.initialize()
+    except Exception as e:
+        logging.error(f"❌ Telegram init error: {e}")
+
+    # One concurrent fetch of every feed serves both startup steps below
+    startup_feeds = await fetch_feeds()
 
     # --- STEP 1: Startup initialization (prevents history flooding) ---
     try:
-        await initialize_on_startup(bot)
+        await initialize_on_startup(bot, startup_feeds)
     except Exception as e:
         logging.error(f"❌ Startup init error: {e}")
 
     # --- STEP 1b: Force a 24-hour recap on first deployment of the day ---
     try:
-        await force_deploy_summary(bot)
+        await force_deploy_summary(bot, startup_feeds)
     except Exception as e:
         logging.error(f"❌ Deploy summary error: {e}")
 
+    # Dyno restarts send SIGTERM — cancel the loop so the finally block
+    # below gets to persist the deferred state before exit.
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except NotImplementedError:
+        pass  # Windows
+
     # --- STEP 2: Live monitoring loop ---
     logging.info("🔄 Entering live monitoring mode...")
-    while True:
-        try:
-            await process_news_feed(bot)
-        except Exception as e:
-            logging.error(f"❌ Main Error: {e}")
+    try:
+        while True:
+            new_count = 0
+            try:
+                new_count = await process_news_feed(bot)
+            except Exception as e:
+                logging.error(f"❌ Main Error: {e}")
 
-        # Check whether any session summary is due (Asian/London/NY/Daily)
-        try:
-            await maybe_post_session_summaries(bot)
-        except Exception as e:
-            logging.error(f"❌ Session summary check error: {e}")
+            # Persist this cycle's bot_state + summary items in one batch,
+            # on a worker thread so the blocking commit doesn't stall the loop
+            await asyncio.to_thread(flush_state)
+
+            # Check whether any session summary is due (Asian/London/NY/Daily)
+            try:
+                await maybe_post_session_summaries(bot)
+            except Exception as e:
+                logging.error(f"❌ Session summary check error: {e}")
 
-        await asyncio.sleep(60)
+            await asyncio.sleep(next_poll_delay(new_count))
+    except asyncio.CancelledError:
+        logging.info("🛑 Shutdown requested — saving state.")
+    finally:
+        await asyncio.to_thread(flush_state, True)
+        await bot.shutdown()
+        # OPENAI_CLIENT shares this pool, so one close covers both
+        await HTTP_CLIENT.aclose()
 
 
 if __name__ == "__main__":
+    if uvloop is not None:
+        uvloop.install()
     asyncio.run(main())